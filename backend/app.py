@@ -1,111 +1,267 @@
+import base64
+import hashlib
+import heapq
+import html
+import io
 import json
 import os
 import re
-import secrets
+import shutil
 import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from collections import OrderedDict
 from datetime import datetime, timedelta
+from itertools import islice
 
 import PyPDF2
-from flask import Flask, jsonify, request, send_from_directory, session
+from flask import Flask, Response, jsonify, request, session
 from flask_cors import CORS
-from werkzeug.security import check_password_hash, generate_password_hash
+from werkzeug.serving import is_running_from_reloader
 from werkzeug.utils import secure_filename
 
+from assets import AssetManifest
+from db import (
+    DB_PATH,
+    compress_text,
+    db_connection,
+    decompress_text,
+    set_statement_observer,
+)
+from jobs import JobQueue
+from metrics import REGISTRY, instrument_app, observe_statement, timed
+from migrations import migrate
+from passwords import PasswordHashBusy, PasswordHasher
+from reextract import Reextractor
+from sessions import configure_sessions, skip_session
+from storage import storage_from_config
+from user_stats import (
+    add_user,
+    forget_user,
+    live_stats,
+    record_analyses,
+    record_resumes,
+)
+
 # Get absolute paths for static files
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Static files are served from the in-memory asset manifest below
 app = Flask(
     __name__,
-    static_folder=os.path.join(BASE_DIR, "static"),
-    static_url_path="/static",
+    static_folder=None,
     template_folder=os.path.join(BASE_DIR, "frontend"),
 )
-app.secret_key = secrets.token_hex(32)
-app.config["UPLOAD_FOLDER"] = "uploads"
+app.config["UPLOAD_FOLDER"] = os.environ.get("UPLOAD_FOLDER", "uploads")
+# Precompressed static variants written by ``python assets.py``
+app.config["ASSET_BUILD_DIR"] = os.environ.get(
+    "ASSET_BUILD_DIR", os.path.join(BASE_DIR, "build", "static")
+)
+# Where uploaded originals live: sharded local files, S3, or in memory
+app.config["STORAGE_BACKEND"] = os.environ.get("STORAGE_BACKEND", "local")
+app.config["STORAGE_SHARD_DEPTH"] = int(os.environ.get("STORAGE_SHARD_DEPTH", 2))
+app.config["S3_BUCKET"] = os.environ.get("S3_BUCKET", "")
+app.config["S3_PREFIX"] = os.environ.get("S3_PREFIX", "resumes/")
+app.config["S3_ENDPOINT_URL"] = os.environ.get("S3_ENDPOINT_URL") or None
 app.config["MAX_CONTENT_LENGTH"] = 16 * 1024 * 1024  # 16MB max file size
 app.config["PERMANENT_SESSION_LIFETIME"] = timedelta(days=7)
+# PDF extraction budget (0 disables a limit) and optional page-parallel mode
+app.config["PDF_MAX_PAGES"] = int(os.environ.get("PDF_MAX_PAGES", 50))
+app.config["PDF_MAX_CHARS"] = int(os.environ.get("PDF_MAX_CHARS", 200_000))
+app.config["PDF_PARALLEL_WORKERS"] = int(os.environ.get("PDF_PARALLEL_WORKERS", 0))
+app.config["PDF_PARALLEL_MIN_PAGES"] = int(os.environ.get("PDF_PARALLEL_MIN_PAGES", 40))
+# Background jobs (uploads opt in per request with ?async=1)
+app.config["JOB_WORKERS"] = int(os.environ.get("JOB_WORKERS", 2))
+# Background re-extraction after skill vocabulary changes, at most this busy
+app.config["REEXTRACT_ON_STARTUP"] = os.environ.get("REEXTRACT_ON_STARTUP", "1") == "1"
+app.config["REEXTRACT_BATCH_SIZE"] = int(os.environ.get("REEXTRACT_BATCH_SIZE", 200))
+app.config["REEXTRACT_DUTY_CYCLE"] = float(os.environ.get("REEXTRACT_DUTY_CYCLE", 0.2))
+# Uploaded originals are written while hashing ("sync"), after the response
+# ("async") or not at all ("none"); parsing always reads the upload stream
+app.config["UPLOAD_KEEP_ORIGINALS"] = os.environ.get("UPLOAD_KEEP_ORIGINALS", "sync")
+if app.config["UPLOAD_KEEP_ORIGINALS"] not in ("sync", "async", "none"):
+    raise ValueError(
+        f"Unknown UPLOAD_KEEP_ORIGINALS: {app.config['UPLOAD_KEEP_ORIGINALS']}"
+    )
+# Memoized gap/roadmap/course results per (skill set, role)
+app.config["ANALYSIS_CACHE_SIZE"] = int(os.environ.get("ANALYSIS_CACHE_SIZE", 1024))
+app.config["ANALYSIS_CACHE_TTL"] = int(os.environ.get("ANALYSIS_CACHE_TTL", 3600))
+# Rendered /api/dashboard and /api/profile bodies, keyed by user data version
+app.config["USER_RESPONSE_CACHE_SIZE"] = int(
+    os.environ.get("USER_RESPONSE_CACHE_SIZE", 2048)
+)
+app.config["USER_RESPONSE_CACHE_TTL"] = int(
+    os.environ.get("USER_RESPONSE_CACHE_TTL", 300)
+)
+# Release identifier for those ETags (Render sets RENDER_GIT_COMMIT); without
+# one, a hash of the backend source stands in
+app.config["RELEASE_ID"] = os.environ.get("RELEASE_ID") or os.environ.get(
+    "RENDER_GIT_COMMIT", ""
+)
+# Sampling profiler: profile every Nth request into PROFILE_DIR (0 disables)
+app.config["PROFILE_EVERY_N"] = int(os.environ.get("PROFILE_EVERY_N", 0))
+app.config["PROFILE_DIR"] = os.environ.get(
+    "PROFILE_DIR", os.path.join(BASE_DIR, "profiles")
+)
+# Upper bound on resume x role pairs in one /api/analyze/batch request
+app.config["ANALYZE_BATCH_MAX_ITEMS"] = int(
+    os.environ.get("ANALYZE_BATCH_MAX_ITEMS", 5000)
+)
+# Accounts allowed to search every student's resume by skill
+app.config["RECRUITER_EMAILS"] = {
+    email.strip().lower()
+    for email in os.environ.get("RECRUITER_EMAILS", "").split(",")
+    if email.strip()
+}
+app.config["SEARCH_MAX_RESULTS"] = int(os.environ.get("SEARCH_MAX_RESULTS", 100))
+app.config["HISTORY_PAGE_SIZE"] = int(os.environ.get("HISTORY_PAGE_SIZE", 20))
+app.config["HISTORY_MAX_PAGE_SIZE"] = int(os.environ.get("HISTORY_MAX_PAGE_SIZE", 100))
+# Werkzeug method string; existing hashes are upgraded on the next login
+app.config["PASSWORD_HASH_METHOD"] = os.environ.get(
+    "PASSWORD_HASH_METHOD", "pbkdf2:sha256:600000"
+)
+app.config["PASSWORD_HASH_WORKERS"] = int(os.environ.get("PASSWORD_HASH_WORKERS", 2))
+app.config["PASSWORD_HASH_MAX_QUEUE"] = int(
+    os.environ.get("PASSWORD_HASH_MAX_QUEUE", 32)
+)
+app.config["PASSWORD_HASH_TIMEOUT"] = float(os.environ.get("PASSWORD_HASH_TIMEOUT", 10))
 
 CORS(app, supports_credentials=True)
 
+# Latency histograms per endpoint, timing spans and DB statement timings
+instrument_app(app, app.config["PROFILE_EVERY_N"], app.config["PROFILE_DIR"])
+set_statement_observer(observe_statement)
+
 
 # Database initialization
 def init_db():
-    # Get the project root directory (parent of backend folder)
-    project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-    db_dir = os.path.join(project_root, "database")
-
     # Create database directory if it doesn't exist
-    os.makedirs(db_dir, exist_ok=True)
-
-    db_path = os.path.join(db_dir, "skilllens.db")
-    conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-
-    # Users table
-    c.execute("""CREATE TABLE IF NOT EXISTS users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        email TEXT UNIQUE NOT NULL,
-        password TEXT NOT NULL,
-        full_name TEXT NOT NULL,
-        phone TEXT,
-        location TEXT,
-        bio TEXT,
-        linkedin TEXT,
-        github TEXT,
-        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-    )""")
-
-    # Resumes table
-    c.execute("""CREATE TABLE IF NOT EXISTS resumes (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        filename TEXT NOT NULL,
-        extracted_text TEXT,
-        skills_json TEXT,
-        uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id)
-    )""")
-
-    # Analysis table
-    c.execute("""CREATE TABLE IF NOT EXISTS analysis (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        user_id INTEGER NOT NULL,
-        resume_id INTEGER NOT NULL,
-        target_role TEXT NOT NULL,
-        skill_gap_json TEXT,
-        roadmap_json TEXT,
-        score INTEGER,
-        analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-        FOREIGN KEY (user_id) REFERENCES users (id),
-        FOREIGN KEY (resume_id) REFERENCES resumes (id)
-    )""")
-
-    conn.commit()
-    conn.close()
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+
+    # Bring the schema up to date (see migrations.py)
+    with db_connection() as conn:
+        migrate(conn)
 
 
 # Initialize database on startup
 init_db()
 
+# Stable signing keys and the session backend shared by all workers
+configure_sessions(
+    app,
+    db_connection,
+    os.environ.get("SECRET_KEY_FILE", os.path.join(BASE_DIR, "database", "secret_key")),
+)
+
 
 # PDF text extraction
-def extract_text_from_pdf(file_path):
+_pdf_pool = None
+
+
+def _get_pdf_pool(workers):
+    global _pdf_pool
+    if _pdf_pool is None:
+        _pdf_pool = ProcessPoolExecutor(max_workers=workers)
+    return _pdf_pool
+
+
+def _extract_page_range(file_path, start, stop):
+    """Worker: extract pages [start, stop) of a PDF on disk"""
+    pdf_reader = PyPDF2.PdfReader(file_path)
+    return [
+        pdf_reader.pages[index].extract_text() or "" for index in range(start, stop)
+    ]
+
+
+def _iter_pages_parallel(file_path, page_count, workers):
+    chunk = -(-page_count // workers)
+    pool = _get_pdf_pool(workers)
+    futures = [
+        pool.submit(
+            _extract_page_range, file_path, start, min(start + chunk, page_count)
+        )
+        for start in range(0, page_count, chunk)
+    ]
     try:
-        text = ""
-        with open(file_path, "rb") as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            for page in pdf_reader.pages:
-                text += page.extract_text()
-        return text
+        for future in futures:
+            yield from future.result()
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _pdf_path(source):
+    """Return (path, spool) for a PDF path or file object
+
+    Paths and file objects backed by a file on disk are used in place (spool
+    is None); other streams, such as uploads, are copied to a temporary file
+    that the caller closes, which deletes it.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        return source, None
+    name = getattr(source, "name", None)
+    if isinstance(name, str) and os.path.isfile(name):
+        return name, None
+
+    position = source.tell()
+    source.seek(0)
+    spool = tempfile.NamedTemporaryFile(suffix=".pdf")
+    shutil.copyfileobj(source, spool)
+    spool.flush()
+    source.seek(position)
+    return spool.name, spool
+
+
+def stream_pdf_text(source, max_pages=None, max_chars=None):
+    """Yield page text from a PDF path or file object, within a page/char budget"""
+    if max_pages is None:
+        max_pages = app.config["PDF_MAX_PAGES"]
+    if max_chars is None:
+        max_chars = app.config["PDF_MAX_CHARS"]
+
+    pdf_reader = PyPDF2.PdfReader(source)
+    page_count = len(pdf_reader.pages)
+    if max_pages:
+        page_count = min(page_count, max_pages)
+
+    # Large documents are split into page ranges across processes, which
+    # reopen the PDF from disk
+    workers = app.config["PDF_PARALLEL_WORKERS"]
+    spool = None
+    if workers > 1 and page_count >= app.config["PDF_PARALLEL_MIN_PAGES"]:
+        path, spool = _pdf_path(source)
+        pages = _iter_pages_parallel(path, page_count, workers)
+    else:
+        pages = (
+            page.extract_text() or "" for page in islice(pdf_reader.pages, page_count)
+        )
+
+    chars = 0
+    try:
+        for text in pages:
+            if max_chars and chars + len(text) >= max_chars:
+                yield text[: max_chars - chars]
+                break
+            chars += len(text)
+            yield text
+    finally:
+        pages.close()
+        if spool is not None:
+            spool.close()
+
+
+@timed()
+def extract_text_from_pdf(file_path, max_pages=None, max_chars=None):
+    try:
+        return "".join(stream_pdf_text(file_path, max_pages, max_chars))
     except Exception as e:
         return f"Error extracting PDF: {str(e)}"
 
 
-# AI Skill Extraction Engine
-def extract_skills_from_resume(resume_text):
-    """Advanced skill extraction using pattern matching and NLP"""
-
-    # Comprehensive skill databases
-    programming_languages = [
+# Comprehensive skill databases
+SKILL_VOCABULARY = {
+    "programming_languages": [
         "python",
         "java",
         "javascript",
@@ -125,9 +281,8 @@ def extract_skills_from_resume(resume_text):
         "perl",
         "dart",
         "sql",
-    ]
-
-    web_technologies = [
+    ],
+    "web_technologies": [
         "html",
         "css",
         "react",
@@ -151,9 +306,8 @@ def extract_skills_from_resume(resume_text):
         "less",
         "rest api",
         "graphql",
-    ]
-
-    data_science = [
+    ],
+    "data_science": [
         "machine learning",
         "deep learning",
         "tensorflow",
@@ -179,9 +333,8 @@ def extract_skills_from_resume(resume_text):
         "time series",
         "regression",
         "classification",
-    ]
-
-    databases = [
+    ],
+    "databases": [
         "mysql",
         "postgresql",
         "mongodb",
@@ -194,9 +347,8 @@ def extract_skills_from_resume(resume_text):
         "mariadb",
         "neo4j",
         "elasticsearch",
-    ]
-
-    cloud_devops = [
+    ],
+    "cloud_devops": [
         "aws",
         "azure",
         "gcp",
@@ -214,9 +366,8 @@ def extract_skills_from_resume(resume_text):
         "linux",
         "bash",
         "shell scripting",
-    ]
-
-    tools_frameworks = [
+    ],
+    "tools_frameworks": [
         "jupyter",
         "vs code",
         "pycharm",
@@ -232,9 +383,8 @@ def extract_skills_from_resume(resume_text):
         "figma",
         "adobe xd",
         "photoshop",
-    ]
-
-    soft_skills = [
+    ],
+    "soft_skills": [
         "leadership",
         "communication",
         "teamwork",
@@ -245,7 +395,96 @@ def extract_skills_from_resume(resume_text):
         "agile",
         "scrum",
         "presentation",
-    ]
+    ],
+}
+
+# Categories whose short entries are acronyms and are displayed upper-cased
+ACRONYM_CATEGORIES = ("databases", "cloud_devops")
+
+
+def format_skill_name(category, skill):
+    """Display form of a vocabulary entry, as stored in skills_json"""
+    if category in ACRONYM_CATEGORIES and len(skill) <= 5:
+        return skill.upper()
+    return skill.title()
+
+
+class SkillMatcher:
+    """Single-pass matcher for the whole skill vocabulary.
+
+    Every term is compiled into one alternation (longest first) inside a
+    lookahead, so a single scan of the text tests each start position with the
+    same ``\\b`` word-boundary rules as a separate ``re.search`` per term. The
+    alternation only reports the longest term at a position, so shorter terms
+    that are a prefix of it (``c`` / ``c++``) are re-checked there.
+    """
+
+    def __init__(self, vocabulary):
+        self.vocabulary = {
+            category: tuple(terms) for category, terms in vocabulary.items()
+        }
+        terms = sorted(
+            {term for group in self.vocabulary.values() for term in group},
+            key=lambda term: (-len(term), term),
+        )
+        self._pattern = re.compile(
+            r"(?=\b(" + "|".join(re.escape(term) for term in terms) + r")\b)"
+        )
+        self._prefixes = {}
+        for term in terms:
+            prefixes = [
+                (other, re.compile(re.escape(other) + r"\b"))
+                for other in terms
+                if other != term and term.startswith(other)
+            ]
+            if prefixes:
+                self._prefixes[term] = prefixes
+        self._display = {
+            category: [(term, format_skill_name(category, term)) for term in group]
+            for category, group in self.vocabulary.items()
+        }
+
+    def find_terms(self, text_lower):
+        """Return the set of vocabulary terms present in lower-cased text"""
+        found = set()
+        for match in self._pattern.finditer(text_lower):
+            term = match.group(1)
+            found.add(term)
+            for prefix, prefix_re in self._prefixes.get(term, ()):
+                if prefix not in found and prefix_re.match(text_lower, match.start()):
+                    found.add(prefix)
+        return found
+
+    def match(self, text_lower):
+        """Return matched skills per category, in vocabulary order"""
+        found = self.find_terms(text_lower)
+        return {
+            category: [display for term, display in entries if term in found]
+            for category, entries in self._display.items()
+        }
+
+
+SKILL_MATCHER = SkillMatcher(SKILL_VOCABULARY)
+
+# Bump when extraction changes in a way the vocabulary itself does not show
+EXTRACTION_REVISION = 1
+
+
+def skill_vocabulary_version():
+    """Short fingerprint recorded on every resume extracted with this vocabulary"""
+    payload = json.dumps(
+        [EXTRACTION_REVISION, SKILL_VOCABULARY, ACRONYM_CATEGORIES], sort_keys=True
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+SKILL_VOCABULARY_VERSION = skill_vocabulary_version()
+
+
+# AI Skill Extraction Engine
+@timed()
+def extract_skills_from_resume(resume_text):
+    """Advanced skill extraction using pattern matching and NLP"""
 
     # Convert resume to lowercase for matching
     text_lower = resume_text.lower()
@@ -264,36 +503,8 @@ def extract_skills_from_resume(resume_text):
         "career_level": "Beginner",
     }
 
-    # Extract skills by category
-    for lang in programming_languages:
-        if re.search(r"\b" + re.escape(lang) + r"\b", text_lower):
-            extracted["programming_languages"].append(lang.title())
-
-    for tech in web_technologies:
-        if re.search(r"\b" + re.escape(tech) + r"\b", text_lower):
-            extracted["web_technologies"].append(tech.title())
-
-    for skill in data_science:
-        if re.search(r"\b" + re.escape(skill) + r"\b", text_lower):
-            extracted["data_science"].append(skill.title())
-
-    for db in databases:
-        if re.search(r"\b" + re.escape(db) + r"\b", text_lower):
-            extracted["databases"].append(db.upper() if len(db) <= 5 else db.title())
-
-    for skill in cloud_devops:
-        if re.search(r"\b" + re.escape(skill) + r"\b", text_lower):
-            extracted["cloud_devops"].append(
-                skill.upper() if len(skill) <= 5 else skill.title()
-            )
-
-    for tool in tools_frameworks:
-        if re.search(r"\b" + re.escape(tool) + r"\b", text_lower):
-            extracted["tools_frameworks"].append(tool.title())
-
-    for skill in soft_skills:
-        if re.search(r"\b" + re.escape(skill) + r"\b", text_lower):
-            extracted["soft_skills"].append(skill.title())
+    # Extract skills by category in a single pass over the text
+    extracted.update(SKILL_MATCHER.match(text_lower))
 
     # Extract certifications
     cert_patterns = [
@@ -618,21 +829,72 @@ ROLE_REQUIREMENTS = {
 }
 
 
-# Skill Gap Analysis
-def analyze_skill_gap(extracted_skills, target_role):
-    """Compare extracted skills with role requirements"""
+# Compiled role requirements
+REQUIREMENT_TIERS = (("critical", 3), ("important", 2), ("nice_to_have", 1))
+
+
+class RoleRequirementIndex:
+    """ROLE_REQUIREMENTS compiled for set-based gap analysis.
+
+    Per role and tier it keeps the (display, lower-cased) skill pairs in their
+    original order plus a frozenset of the normalized names, and the weighted
+    totals used for scoring, so a gap analysis is a handful of set lookups.
+    """
+
+    def __init__(self, requirements):
+        self.fingerprint = role_requirements_fingerprint(requirements)
+        self.roles = {}
+        for role, tiers in requirements.items():
+            compiled = []
+            for tier, weight in REQUIREMENT_TIERS:
+                pairs = tuple((skill, skill.lower()) for skill in tiers[tier])
+                compiled.append(
+                    (tier, weight, pairs, frozenset(key for _, key in pairs))
+                )
+            self.roles[role] = {
+                "tiers": tuple(compiled),
+                "total_skills": sum(len(pairs) for _, _, pairs, _ in compiled),
+                "max_weight": sum(
+                    len(pairs) * weight for _, weight, pairs, _ in compiled
+                ),
+            }
+
+
+def role_requirements_fingerprint(requirements=None):
+    if requirements is None:
+        requirements = ROLE_REQUIREMENTS
+    return hashlib.sha256(json.dumps(requirements, sort_keys=True).encode()).hexdigest()
 
-    if target_role not in ROLE_REQUIREMENTS:
-        return {"error": "Invalid role selected"}
 
-    requirements = ROLE_REQUIREMENTS[target_role]
-    all_extracted = []
+_role_index = RoleRequirementIndex(ROLE_REQUIREMENTS)
+_role_index_checked_at = time.monotonic()
+_role_index_lock = threading.Lock()
 
-    # Flatten all extracted skills
-    for category, skills in extracted_skills.items():
-        if isinstance(skills, list):
-            all_extracted.extend([s.lower() for s in skills])
 
+def get_role_index(check_interval=1.0):
+    """Current compiled index, rebuilt if ROLE_REQUIREMENTS was edited"""
+    global _role_index, _role_index_checked_at
+    now = time.monotonic()
+    if now - _role_index_checked_at >= check_interval:
+        with _role_index_lock:
+            if now - _role_index_checked_at >= check_interval:
+                _role_index_checked_at = now
+                if role_requirements_fingerprint() != _role_index.fingerprint:
+                    _role_index = RoleRequirementIndex(ROLE_REQUIREMENTS)
+    return _role_index
+
+
+def normalized_skill_set(extracted_skills):
+    """Lower-cased set of every extracted list entry"""
+    return {
+        skill.lower()
+        for skills in extracted_skills.values()
+        if isinstance(skills, list)
+        for skill in skills
+    }
+
+
+def _gap_for_role(profile, skill_set):
     # Analysis results
     analysis = {
         "present_skills": [],
@@ -643,51 +905,21 @@ def analyze_skill_gap(extracted_skills, target_role):
         "gap_summary": "",
     }
 
-    # Check critical skills
-    for skill in requirements["critical"]:
-        if skill.lower() in all_extracted:
-            analysis["present_skills"].append(skill)
-        else:
-            analysis["critical_missing"].append(skill)
-
-    # Check important skills
-    for skill in requirements["important"]:
-        if skill.lower() not in all_extracted:
-            analysis["important_missing"].append(skill)
-        else:
-            analysis["present_skills"].append(skill)
-
-    # Check nice-to-have skills
-    for skill in requirements["nice_to_have"]:
-        if skill.lower() not in all_extracted:
-            analysis["nice_to_have_missing"].append(skill)
-        else:
-            analysis["present_skills"].append(skill)
+    weighted_present = 0
+    for tier, weight, pairs, keys in profile["tiers"]:
+        missing = analysis[f"{tier}_missing"]
+        present = keys & skill_set
+        for skill, key in pairs:
+            if key in present:
+                analysis["present_skills"].append(skill)
+                weighted_present += weight
+            else:
+                missing.append(skill)
 
     # Calculate score
-    total_skills = (
-        len(requirements["critical"])
-        + len(requirements["important"])
-        + len(requirements["nice_to_have"])
-    )
+    total_skills = profile["total_skills"]
     present_count = len(analysis["present_skills"])
-    critical_weight = len(requirements["critical"]) * 3
-    important_weight = len(requirements["important"]) * 2
-    nice_weight = len(requirements["nice_to_have"]) * 1
-
-    critical_present = len(requirements["critical"]) - len(analysis["critical_missing"])
-    important_present = len(requirements["important"]) - len(
-        analysis["important_missing"]
-    )
-    nice_present = len(requirements["nice_to_have"]) - len(
-        analysis["nice_to_have_missing"]
-    )
-
-    score = (
-        ((critical_present * 3) + (important_present * 2) + (nice_present * 1))
-        / (critical_weight + important_weight + nice_weight)
-        * 100
-    )
+    score = weighted_present / profile["max_weight"] * 100
     analysis["score"] = int(score)
 
     # Generate summary
@@ -711,7 +943,36 @@ def analyze_skill_gap(extracted_skills, target_role):
     return analysis
 
 
+# Skill Gap Analysis
+@timed()
+def analyze_skill_gap(extracted_skills, target_role):
+    """Compare extracted skills with role requirements"""
+
+    profile = get_role_index().roles.get(target_role)
+    if profile is None:
+        return {"error": "Invalid role selected"}
+
+    return _gap_for_role(profile, normalized_skill_set(extracted_skills))
+
+
+@timed()
+def analyze_all_roles(extracted_skills):
+    """Gap analysis of one skill set against every role, in a single pass"""
+    skill_set = normalized_skill_set(extracted_skills)
+    return {
+        role: _gap_for_role(profile, skill_set)
+        for role, profile in get_role_index().roles.items()
+    }
+
+
+def rank_roles(extracted_skills):
+    """Roles ordered by fit (best first) with their gap analyses"""
+    ranked = analyze_all_roles(extracted_skills).items()
+    return sorted(ranked, key=lambda item: item[1]["score"], reverse=True)
+
+
 # Learning Roadmap Generator
+@timed()
 def generate_roadmap(skill_gap, target_role, career_level):
     """Generate personalized learning roadmap"""
 
@@ -794,6 +1055,7 @@ def generate_roadmap(skill_gap, target_role, career_level):
 
 
 # Course Recommendations
+@timed()
 def recommend_courses(missing_skills):
     """Recommend courses for each missing skill"""
 
@@ -889,31 +1151,208 @@ def recommend_courses(missing_skills):
     return recommendations
 
 
+# Analysis result cache
+class TTLCache:
+    """Bounded LRU cache whose entries expire after ``ttl`` seconds.
+
+    With a ``version`` callable, the whole cache is dropped when its value
+    changes; pass a ``check_interval`` when computing the version is
+    expensive. Cached values are shared between requests and must be treated
+    as read-only.
+    """
+
+    def __init__(self, maxsize, ttl, version=None, check_interval=1.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.version = version
+        self.check_interval = check_interval
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._current_version = version() if version else None
+        self._checked_at = time.monotonic()
+
+    def _check_version(self, now):
+        if self.version is None or now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+        current = self.version()
+        if current != self._current_version:
+            self._current_version = current
+            self._entries.clear()
+
+    def get(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._check_version(now)
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def analysis_cache_key(skills, target_role):
+    """Canonical key: the role plus the normalized set of extracted skills"""
+    skill_set = sorted(
+        {
+            str(skill).lower()
+            for value in skills.values()
+            if isinstance(value, list)
+            for skill in value
+        }
+    )
+    payload = json.dumps([target_role, skills.get("career_level"), skill_set])
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+ANALYSIS_CACHE = TTLCache(
+    app.config["ANALYSIS_CACHE_SIZE"],
+    app.config["ANALYSIS_CACHE_TTL"],
+    lambda: get_role_index().fingerprint,
+    check_interval=0,
+)
+
+
+def _analysis_cache_metrics():
+    stats = ANALYSIS_CACHE.stats()
+    return [
+        (
+            f"skilllens_analysis_cache_{name}_total",
+            "counter",
+            f"Analysis cache {name}",
+            [({}, stats[name])],
+        )
+        for name in ("hits", "misses", "evictions")
+    ] + [
+        (
+            "skilllens_analysis_cache_size",
+            "gauge",
+            "Analysis cache entries",
+            [({}, stats["size"])],
+        )
+    ]
+
+
+REGISTRY.add_collector(_analysis_cache_metrics)
+
+
+def run_role_analysis(skills, target_role):
+    """Gap analysis, roadmap and course picks for a skill set, memoized"""
+    key = analysis_cache_key(skills, target_role)
+    cached = ANALYSIS_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    # Analyze skill gap
+    gap_analysis = analyze_skill_gap(skills, target_role)
+
+    # Generate roadmap
+    roadmap = generate_roadmap(gap_analysis, target_role, skills["career_level"])
+
+    # Recommend courses
+    all_missing = gap_analysis["critical_missing"] + gap_analysis["important_missing"]
+    courses = recommend_courses(all_missing[:10])
+
+    result = (gap_analysis, roadmap, courses)
+    ANALYSIS_CACHE.put(key, result)
+    return result
+
+
 # ==================== API ENDPOINTS ====================
 
 
+# Frontend files, scanned once at startup
+ASSETS = AssetManifest(BASE_DIR, app.config["ASSET_BUILD_DIR"])
+
+
+def serve_asset(path):
+    # Static files never need the session, and immutable ones are cached by
+    # shared caches, which must not store anyone's Set-Cookie
+    skip_session()
+    asset, cache_control = ASSETS.lookup(path)
+    if asset is None:
+        return jsonify({"error": "Not found"}), 404
+
+    encoding, body, etag = asset.select(request.accept_encodings)
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(body, mimetype=asset.mimetype)
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = cache_control
+    response.vary.add("Accept-Encoding")
+    return response
+
+
 # Serve frontend
 @app.route("/")
 def serve_frontend():
-    frontend_dir = os.path.join(BASE_DIR, "frontend")
-    return send_from_directory(frontend_dir, "index.html")
+    return serve_asset("index.html")
 
 
 @app.route("/dashboard.html")
 def serve_dashboard():
-    frontend_dir = os.path.join(BASE_DIR, "frontend")
-    return send_from_directory(frontend_dir, "dashboard.html")
+    return serve_asset("dashboard.html")
 
 
 @app.route("/<path:filename>")
 def serve_static(filename):
-    # Try frontend directory first
-    frontend_dir = os.path.join(BASE_DIR, "frontend")
-    if os.path.exists(os.path.join(frontend_dir, filename)):
-        return send_from_directory(frontend_dir, filename)
-    # Fallback to static directory
-    static_dir = os.path.join(BASE_DIR, "static")
-    return send_from_directory(static_dir, filename)
+    return serve_asset(filename)
+
+
+# Prometheus metrics
+@app.route("/metrics")
+def prometheus_metrics():
+    return Response(REGISTRY.render(), mimetype="text/plain; version=0.0.4")
+
+
+# Password hashing runs on its own bounded pool
+password_hasher = PasswordHasher(
+    app.config["PASSWORD_HASH_METHOD"],
+    workers=app.config["PASSWORD_HASH_WORKERS"],
+    max_queue=app.config["PASSWORD_HASH_MAX_QUEUE"],
+    timeout=app.config["PASSWORD_HASH_TIMEOUT"],
+)
+REGISTRY.add_collector(password_hasher.collect_metrics)
+
+
+def password_hash_busy():
+    response = jsonify({"error": "Server busy, please try again"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
 
 
 # User Registration
@@ -928,26 +1367,30 @@ def register():
         return jsonify({"error": "All fields required"}), 400
 
     try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        db_path = os.path.join(project_root, "database", "skilllens.db")
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-
-        # Check if user exists
-        c.execute("SELECT id FROM users WHERE email = ?", (email,))
-        if c.fetchone():
-            return jsonify({"error": "Email already registered"}), 400
-
-        # Create user
-        hashed_password = generate_password_hash(password)
-        c.execute(
-            "INSERT INTO users (email, password, full_name) VALUES (?, ?, ?)",
-            (email, hashed_password, full_name),
-        )
-        conn.commit()
-
-        user_id = c.lastrowid
-        conn.close()
+        # Check if user exists before spending a hashing slot on the request
+        with db_connection() as conn:
+            if conn.execute(
+                "SELECT id FROM users WHERE email = ?", (email,)
+            ).fetchone():
+                return jsonify({"error": "Email already registered"}), 400
+
+        # Hash without holding a pooled connection; it is the slow part
+        hashed_password = password_hasher.hash(password)
+
+        with db_connection() as conn:
+            c = conn.cursor()
+
+            # Create user; the UNIQUE email catches a concurrent registration
+            try:
+                c.execute(
+                    "INSERT INTO users (email, password, full_name) VALUES (?, ?, ?)",
+                    (email, hashed_password, full_name),
+                )
+            except sqlite3.IntegrityError:
+                return jsonify({"error": "Email already registered"}), 400
+            user_id = c.lastrowid
+            add_user(c, user_id)
+            conn.commit()
 
         session["user_id"] = user_id
         session["email"] = email
@@ -961,6 +1404,8 @@ def register():
             }
         )
 
+    except PasswordHashBusy:
+        return password_hash_busy()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -976,18 +1421,34 @@ def login():
         return jsonify({"error": "Email and password required"}), 400
 
     try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        db_path = os.path.join(project_root, "database", "skilllens.db")
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
+        with db_connection() as conn:
+            c = conn.cursor()
 
-        c.execute("SELECT id, password, full_name FROM users WHERE email = ?", (email,))
-        user = c.fetchone()
-        conn.close()
+            c.execute(
+                "SELECT id, password, full_name FROM users WHERE email = ?", (email,)
+            )
+            user = c.fetchone()
 
-        if not user or not check_password_hash(user[1], password):
+        if not user or not password_hasher.verify(user[1], password):
             return jsonify({"error": "Invalid credentials"}), 401
 
+        # Upgrade hashes made with an older method or cost; only if the
+        # password has not been changed in the meantime. When hashing is
+        # saturated the upgrade waits for a later login instead of failing this one
+        try:
+            new_hash = None
+            if password_hasher.needs_rehash(user[1]):
+                new_hash = password_hasher.hash(password)
+        except PasswordHashBusy:
+            new_hash = None
+        if new_hash:
+            with db_connection() as conn:
+                conn.execute(
+                    "UPDATE users SET password = ? WHERE id = ? AND password = ?",
+                    (new_hash, user[0], user[1]),
+                )
+                conn.commit()
+
         session["user_id"] = user[0]
         session["email"] = email
         session["full_name"] = user[2]
@@ -1000,6 +1461,8 @@ def login():
             }
         )
 
+    except PasswordHashBusy:
+        return password_hash_busy()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1028,6 +1491,356 @@ def check_auth():
     return jsonify({"authenticated": False})
 
 
+# Upload storage: hash while streaming into the blob store, one blob per content hash
+HASH_CHUNK_SIZE = 64 * 1024
+
+storage = storage_from_config(
+    app.config, os.path.join(BASE_DIR, app.config["UPLOAD_FOLDER"])
+)
+
+
+def blob_key(content_hash):
+    return f"{content_hash}.pdf"
+
+
+def save_upload(file, keep=True):
+    """Hash an upload in one pass, streaming it into storage if keep
+
+    The upload stream is rewound so it can be parsed without reading the
+    stored copy back.
+    """
+    digest = hashlib.sha256()
+    writer = storage.writer() if keep else None
+    try:
+        for chunk in iter(lambda: file.stream.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+            if writer:
+                writer.write(chunk)
+        content_hash = digest.hexdigest()
+        if writer:
+            writer.commit(blob_key(content_hash))
+    except BaseException:
+        if writer:
+            writer.abort()
+        raise
+    file.stream.seek(0)
+    return content_hash
+
+
+# Deferred writes of uploaded originals (UPLOAD_KEEP_ORIGINALS=async)
+original_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="upload-writer")
+
+
+def write_original(data, content_hash):
+    if not storage.exists(blob_key(content_hash)):
+        storage.put(blob_key(content_hash), io.BytesIO(data))
+
+
+# Skills are also stored as resume_skills rows (plus scalar columns on resumes)
+# for queries across resumes; reading one resume's skills_json stays cheaper
+# than reassembling it from rows
+def resume_skill_rows(resume_id, skills):
+    """Vocabulary matches only; certification and project lines are free text"""
+    return [
+        (resume_id, category, skill)
+        for category in SKILL_VOCABULARY
+        for skill in skills.get(category, [])
+    ]
+
+
+def load_resume_skills(conn, user_id, resume_ids):
+    """{resume_id: skills} for the user's resumes among resume_ids"""
+    skills_by_resume = {}
+    # Chunked to stay under the SQLite bound-parameter limit
+    for start in range(0, len(resume_ids), 500):
+        chunk = resume_ids[start : start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        for resume_id, skills_json in conn.execute(
+            f"SELECT id, skills_json FROM resumes WHERE user_id = ? AND id IN ({placeholders})",
+            [user_id, *chunk],
+        ):
+            skills_by_resume[resume_id] = json.loads(decompress_text(skills_json))
+    return skills_by_resume
+
+
+def get_resume_skills(conn, user_id, resume_id):
+    found = load_resume_skills(conn, user_id, [resume_id])
+    return next(iter(found.values()), None)
+
+
+# Inverted index: skill_index holds one (normalized skill, resume_id) posting
+# per resume and skill_counts the number of postings per skill
+def store_resume_skills(c, resume_id, skills):
+    """Insert a new resume's resume_skills rows and index postings"""
+    rows = resume_skill_rows(resume_id, skills)
+    c.executemany(
+        "INSERT OR IGNORE INTO resume_skills (resume_id, category, skill) VALUES (?, ?, ?)",
+        rows,
+    )
+    terms = sorted({skill.lower() for _, _, skill in rows})
+    c.executemany(
+        "INSERT INTO skill_index (skill, resume_id) VALUES (?, ?)",
+        [(term, resume_id) for term in terms],
+    )
+    c.executemany(
+        """INSERT INTO skill_counts (skill, resumes) VALUES (?, 1)
+           ON CONFLICT (skill) DO UPDATE SET resumes = resumes + 1""",
+        [(term,) for term in terms],
+    )
+
+
+def remove_resume_skills(c, resume_ids):
+    """Drop the resumes' resume_skills rows and their index postings"""
+    for start in range(0, len(resume_ids), 500):
+        chunk = resume_ids[start : start + 500]
+        placeholders = ",".join("?" * len(chunk))
+        c.execute(
+            f"SELECT DISTINCT lower(skill), resume_id FROM resume_skills WHERE resume_id IN ({placeholders})",
+            chunk,
+        )
+        # Resumes stored before migration 6 have resume_skills rows but no
+        # postings until the re-extractor reaches them; count only real ones
+        removed = [
+            (skill,)
+            for skill, resume_id in c.fetchall()
+            if c.execute(
+                "DELETE FROM skill_index WHERE skill = ? AND resume_id = ?",
+                (skill, resume_id),
+            ).rowcount
+        ]
+        c.executemany(
+            "UPDATE skill_counts SET resumes = resumes - 1 WHERE skill = ?", removed
+        )
+        c.execute(
+            f"DELETE FROM resume_skills WHERE resume_id IN ({placeholders})", chunk
+        )
+    c.execute("DELETE FROM skill_counts WHERE resumes <= 0")
+
+
+def search_resume_ids(conn, all_skills, any_skills, limit, before=None):
+    """Newest-first ids of resumes with every all_skills and any of any_skills
+
+    before is the keyset cursor: only resume ids below it are returned.
+    """
+    if all_skills:
+        # Walk the rarest required skill's postings and probe the others
+        counts = dict(
+            conn.execute(
+                f"SELECT skill, resumes FROM skill_counts WHERE skill IN ({','.join('?' * len(all_skills))})",
+                all_skills,
+            )
+        )
+        if len(counts) < len(all_skills):
+            return []
+        driver, *others = sorted(all_skills, key=counts.get)
+
+        sql = "SELECT i.resume_id FROM skill_index i WHERE i.skill = ?"
+        params = [driver]
+        if before is not None:
+            sql += " AND i.resume_id < ?"
+            params.append(before)
+        for skill in others:
+            sql += " AND EXISTS (SELECT 1 FROM skill_index WHERE skill = ? AND resume_id = i.resume_id)"
+            params.append(skill)
+        if any_skills:
+            sql += f" AND EXISTS (SELECT 1 FROM skill_index WHERE skill IN ({','.join('?' * len(any_skills))}) AND resume_id = i.resume_id)"
+            params.extend(any_skills)
+        sql += " ORDER BY i.resume_id DESC LIMIT ?"
+        return [row[0] for row in conn.execute(sql, [*params, limit])]
+
+    # OR: the first page of the union lies within each skill's first page
+    pages = []
+    for skill in any_skills:
+        sql = "SELECT resume_id FROM skill_index WHERE skill = ?"
+        params = [skill]
+        if before is not None:
+            sql += " AND resume_id < ?"
+            params.append(before)
+        sql += " ORDER BY resume_id DESC LIMIT ?"
+        pages.append([row[0] for row in conn.execute(sql, [*params, limit])])
+
+    resume_ids = []
+    for resume_id in heapq.merge(*pages, reverse=True):
+        if not resume_ids or resume_ids[-1] != resume_id:
+            resume_ids.append(resume_id)
+            if len(resume_ids) == limit:
+                break
+    return resume_ids
+
+
+# Resume processing (runs inline or as a background job)
+def process_resume(user_id, filename, content_hash, source=None, filepath=None):
+    """Parse and store a resume, reading source if given, else the stored blob
+
+    filepath is ignored; it is accepted for jobs queued by older releases.
+    """
+    # Repeat uploads reuse the cached parse instead of re-reading the PDF
+    with db_connection() as conn:
+        cached = conn.execute(
+            "SELECT extracted_text, skills_json, vocabulary_version FROM resume_blobs WHERE sha256 = ?",
+            (content_hash,),
+        ).fetchone()
+
+    refresh_cached = False
+    if cached:
+        # Stored (compressed) values are copied to the new resume row as-is
+        stored_text, stored_skills, cached_version = cached
+        extracted_text = decompress_text(stored_text)
+        if cached_version == SKILL_VOCABULARY_VERSION:
+            skills = json.loads(decompress_text(stored_skills))
+        else:
+            # Parsed under an older vocabulary: re-extract from the stored text
+            skills = extract_skills_from_resume(extracted_text)
+            stored_skills = compress_text(json.dumps(skills))
+            refresh_cached = True
+    else:
+        # Extract text
+        if source is not None:
+            extracted_text = extract_text_from_pdf(source)
+        else:
+            with storage.open(blob_key(content_hash)) as stored:
+                extracted_text = extract_text_from_pdf(stored)
+
+        # Extract skills
+        skills = extract_skills_from_resume(extracted_text)
+        stored_text = compress_text(extracted_text)
+        stored_skills = compress_text(json.dumps(skills))
+
+    # Save to database
+    with db_connection() as conn:
+        c = conn.cursor()
+        # Under the write lock a concurrent account deletion has either
+        # committed already or waits for this transaction
+        c.execute("BEGIN IMMEDIATE")
+        if not c.execute("SELECT 1 FROM users WHERE id = ?", (user_id,)).fetchone():
+            conn.rollback()
+            raise ValueError("Account no longer exists")
+
+        # The blob row read above may have been released since; the upsert
+        # recreates it from the values in hand
+        referenced = c.execute(
+            """INSERT INTO resume_blobs (sha256, stored_filename, extracted_text, skills_json, vocabulary_version, ref_count)
+               VALUES (?, ?, ?, ?, ?, 1)
+               ON CONFLICT(sha256) DO UPDATE SET ref_count = ref_count + 1""",
+            (
+                content_hash,
+                blob_key(content_hash),
+                stored_text,
+                stored_skills,
+                SKILL_VOCABULARY_VERSION,
+            ),
+        ).rowcount
+        if referenced != 1:
+            raise RuntimeError(f"Could not reference resume blob {content_hash}")
+        if refresh_cached:
+            c.execute(
+                "UPDATE resume_blobs SET skills_json = ?, vocabulary_version = ? WHERE sha256 = ?",
+                (stored_skills, SKILL_VOCABULARY_VERSION, content_hash),
+            )
+        c.execute(
+            """INSERT INTO resumes (user_id, filename, extracted_text, skills_json, content_hash, career_level, experience_years, vocabulary_version)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            (
+                user_id,
+                filename,
+                stored_text,
+                stored_skills,
+                content_hash,
+                skills["career_level"],
+                skills["experience_years"],
+                SKILL_VOCABULARY_VERSION,
+            ),
+        )
+        resume_id = c.lastrowid
+        store_resume_skills(c, resume_id, skills)
+        record_resumes(c, user_id)
+        bump_user_version(c, user_id)
+        conn.commit()
+
+    return {
+        "resume_id": resume_id,
+        "skills": skills,
+        "text_preview": extracted_text[:500],
+    }
+
+
+job_queue = JobQueue(db_connection, workers=app.config["JOB_WORKERS"])
+job_queue.register("resume", process_resume)
+
+
+# Re-extraction of resumes stored under an older skill vocabulary
+def reextract_skills(rows):
+    """Re-run skill extraction on stored text for (id, text, content_hash) rows"""
+    return [
+        (
+            resume_id,
+            content_hash,
+            extract_skills_from_resume(decompress_text(text) or ""),
+        )
+        for resume_id, text, content_hash in rows
+    ]
+
+
+def store_reextracted_skills(c, results):
+    for resume_id, content_hash, skills in results:
+        stored_skills = compress_text(json.dumps(skills))
+        updated = c.execute(
+            """UPDATE resumes SET skills_json = ?, career_level = ?, experience_years = ?, vocabulary_version = ?
+               WHERE id = ?""",
+            (
+                stored_skills,
+                skills["career_level"],
+                skills["experience_years"],
+                SKILL_VOCABULARY_VERSION,
+                resume_id,
+            ),
+        ).rowcount
+        if not updated:
+            continue  # deleted since the batch was read
+
+        remove_resume_skills(c, [resume_id])
+        store_resume_skills(c, resume_id, skills)
+        if content_hash:
+            c.execute(
+                "UPDATE resume_blobs SET skills_json = ?, vocabulary_version = ? WHERE sha256 = ?",
+                (stored_skills, SKILL_VOCABULARY_VERSION, content_hash),
+            )
+
+
+reextractor = Reextractor(
+    db_connection,
+    SKILL_VOCABULARY_VERSION,
+    reextract_skills,
+    store_reextracted_skills,
+    batch_size=app.config["REEXTRACT_BATCH_SIZE"],
+    duty_cycle=app.config["REEXTRACT_DUTY_CYCLE"],
+)
+
+
+def _reextract_metrics():
+    status = reextractor.status()
+    return [
+        (
+            "skilllens_reextract_resumes",
+            "gauge",
+            "Resumes to re-extract for the current skill vocabulary, and done so far",
+            [
+                ({"state": "total"}, status.get("total", 0)),
+                ({"state": "processed"}, status.get("processed", 0)),
+            ],
+        ),
+        (
+            "skilllens_reextract_running",
+            "gauge",
+            "1 while stored resumes are being re-extracted",
+            [({}, int(status["status"] == "running"))],
+        ),
+    ]
+
+
+REGISTRY.add_collector(_reextract_metrics)
+
+
 # Upload Resume
 @app.route("/api/upload-resume", methods=["POST"])
 def upload_resume():
@@ -1049,42 +1862,52 @@ def upload_resume():
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"{session['user_id']}_{timestamp}_{filename}"
 
-        # Get absolute path for uploads
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        uploads_dir = os.path.join(project_root, app.config["UPLOAD_FOLDER"])
-        os.makedirs(uploads_dir, exist_ok=True)
+        # Async is opt-in per request: the response carries a job id instead of
+        # the resume, so only clients that poll /api/jobs/<id> may ask for it.
+        # Background jobs read the stored blob, so they always need it kept
+        use_job = request.args.get("async") == "1"
+        keep_originals = app.config["UPLOAD_KEEP_ORIGINALS"]
+        content_hash = save_upload(file, keep=use_job or keep_originals == "sync")
+
+        # Async mode: hand extraction to the job queue and answer immediately
+        if use_job:
+            job_id = job_queue.submit(
+                "resume",
+                session["user_id"],
+                {
+                    "user_id": session["user_id"],
+                    "filename": filename,
+                    "content_hash": content_hash,
+                },
+            )
+            return jsonify({"success": True, "job_id": job_id, "status": "queued"}), 202
 
-        filepath = os.path.join(uploads_dir, filename)
+        result = process_resume(
+            session["user_id"], filename, content_hash, source=file.stream
+        )
 
-        file.save(filepath)
+        if keep_originals == "async":
+            file.stream.seek(0)
+            original_writer.submit(write_original, file.stream.read(), content_hash)
 
-        # Extract text
-        extracted_text = extract_text_from_pdf(filepath)
+        return jsonify({"success": True, **result})
 
-        # Extract skills
-        skills = extract_skills_from_resume(extracted_text)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Save to database
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        db_path = os.path.join(project_root, "database", "skilllens.db")
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-        c.execute(
-            "INSERT INTO resumes (user_id, filename, extracted_text, skills_json) VALUES (?, ?, ?, ?)",
-            (session["user_id"], filename, extracted_text, json.dumps(skills)),
-        )
-        conn.commit()
-        resume_id = c.lastrowid
-        conn.close()
 
-        return jsonify(
-            {
-                "success": True,
-                "resume_id": resume_id,
-                "skills": skills,
-                "text_preview": extracted_text[:500],
-            }
-        )
+# Background Job Status
+@app.route("/api/jobs/<job_id>", methods=["GET"])
+def get_job(job_id):
+    if "user_id" not in session:
+        return jsonify({"error": "Not authenticated"}), 401
+
+    try:
+        job = job_queue.get(job_id, session["user_id"])
+        if not job:
+            return jsonify({"error": "Job not found"}), 404
+
+        return jsonify({"success": True, "job": job})
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1104,59 +1927,315 @@ def analyze():
         return jsonify({"error": "Resume ID and target role required"}), 400
 
     try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        db_path = os.path.join(project_root, "database", "skilllens.db")
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
+        with db_connection() as conn:
+            c = conn.cursor()
+
+            # Get resume skills
+            skills = get_resume_skills(conn, session["user_id"], resume_id)
+            if skills is None:
+                return jsonify({"error": "Resume not found"}), 404
+
+            # Gap analysis, roadmap and courses (cached per skill set and role)
+            gap_analysis, roadmap, courses = run_role_analysis(skills, target_role)
+
+            # Save analysis
+            c.execute(
+                "INSERT INTO analysis (user_id, resume_id, target_role, skill_gap_json, roadmap_json, score) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    session["user_id"],
+                    resume_id,
+                    target_role,
+                    compress_text(json.dumps(gap_analysis)),
+                    compress_text(json.dumps(roadmap)),
+                    gap_analysis["score"],
+                ),
+            )
+            analysis_id = c.lastrowid
+            record_analyses(
+                c, session["user_id"], [(target_role, gap_analysis["score"])]
+            )
+            bump_user_version(c, session["user_id"])
+            conn.commit()
 
-        # Get resume skills
-        c.execute(
-            "SELECT skills_json FROM resumes WHERE id = ? AND user_id = ?",
-            (resume_id, session["user_id"]),
+        return jsonify(
+            {
+                "success": True,
+                "analysis_id": analysis_id,
+                "gap_analysis": gap_analysis,
+                "roadmap": roadmap,
+                "course_recommendations": courses,
+                "career_level": skills["career_level"],
+            }
         )
-        result = c.fetchone()
 
-        if not result:
-            return jsonify({"error": "Resume not found"}), 404
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# Rank Every Role For A Resume
+@app.route("/api/analyze/rank", methods=["POST"])
+def rank_resume_roles():
+    if "user_id" not in session:
+        return jsonify({"error": "Not authenticated"}), 401
+
+    data = request.json
+    resume_id = data.get("resume_id")
+    persist_top_k = data.get("persist_top_k", 0)
 
-        skills = json.loads(result[0])
+    if not resume_id:
+        return jsonify({"error": "Resume ID required"}), 400
 
-        # Analyze skill gap
-        gap_analysis = analyze_skill_gap(skills, target_role)
+    if not isinstance(persist_top_k, int) or persist_top_k < 0:
+        return jsonify({"error": "persist_top_k must be a non-negative integer"}), 400
 
-        # Generate roadmap
-        roadmap = generate_roadmap(gap_analysis, target_role, skills["career_level"])
+    try:
+        with db_connection() as conn:
+            c = conn.cursor()
+
+            # Get resume skills
+            skills = get_resume_skills(conn, session["user_id"], resume_id)
+            if skills is None:
+                return jsonify({"error": "Resume not found"}), 404
+
+            # Score the skill set against every role at once
+            rankings = [
+                {"target_role": role, "score": gap["score"], "gap_analysis": gap}
+                for role, gap in rank_roles(skills)
+            ]
+
+            # Optionally keep the best matches as regular analyses
+            for ranking in rankings[:persist_top_k]:
+                gap_analysis, roadmap, _ = run_role_analysis(
+                    skills, ranking["target_role"]
+                )
+                c.execute(
+                    "INSERT INTO analysis (user_id, resume_id, target_role, skill_gap_json, roadmap_json, score) VALUES (?, ?, ?, ?, ?, ?)",
+                    (
+                        session["user_id"],
+                        resume_id,
+                        ranking["target_role"],
+                        compress_text(json.dumps(gap_analysis)),
+                        compress_text(json.dumps(roadmap)),
+                        gap_analysis["score"],
+                    ),
+                )
+                ranking["analysis_id"] = c.lastrowid
+            if persist_top_k:
+                record_analyses(
+                    c,
+                    session["user_id"],
+                    [(r["target_role"], r["score"]) for r in rankings[:persist_top_k]],
+                )
+                bump_user_version(c, session["user_id"])
+            conn.commit()
 
-        # Recommend courses
-        all_missing = (
-            gap_analysis["critical_missing"] + gap_analysis["important_missing"]
+        return jsonify(
+            {
+                "success": True,
+                "rankings": rankings,
+                "career_level": skills["career_level"],
+            }
         )
-        courses = recommend_courses(all_missing[:10])
 
-        # Save analysis
-        c.execute(
-            "INSERT INTO analysis (user_id, resume_id, target_role, skill_gap_json, roadmap_json, score) VALUES (?, ?, ?, ?, ?, ?)",
-            (
-                session["user_id"],
-                resume_id,
-                target_role,
-                json.dumps(gap_analysis),
-                json.dumps(roadmap),
-                gap_analysis["score"],
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+# Batch Analysis (streams one NDJSON line per resume/role pair)
+@app.route("/api/analyze/batch", methods=["POST"])
+def analyze_batch():
+    if "user_id" not in session:
+        return jsonify({"error": "Not authenticated"}), 401
+
+    data = request.json
+    resume_ids = data.get("resume_ids")
+    target_roles = data.get("target_roles")
+
+    if not resume_ids or not target_roles:
+        return jsonify({"error": "Resume IDs and target roles required"}), 400
+
+    if (
+        not isinstance(resume_ids, list)
+        or not isinstance(target_roles, list)
+        # bool is an int subclass; JSON true/false are not resume ids
+        or not all(
+            isinstance(resume_id, int) and not isinstance(resume_id, bool)
+            for resume_id in resume_ids
+        )
+        or not all(isinstance(role, str) for role in target_roles)
+    ):
+        return (
+            jsonify(
+                {
+                    "error": "resume_ids must be a list of ids, target_roles a list of roles"
+                }
             ),
+            400,
+        )
+
+    invalid_roles = [role for role in target_roles if role not in ROLE_REQUIREMENTS]
+    if invalid_roles:
+        return (
+            jsonify({"error": f"Invalid roles: {', '.join(map(str, invalid_roles))}"}),
+            400,
         )
-        conn.commit()
-        analysis_id = c.lastrowid
-        conn.close()
+
+    if len(resume_ids) * len(target_roles) > app.config["ANALYZE_BATCH_MAX_ITEMS"]:
+        return jsonify({"error": "Too many resume/role combinations"}), 400
+
+    user_id = session["user_id"]
+
+    try:
+        # Fetch every requested resume up front
+        with db_connection() as conn:
+            skills_by_resume = load_resume_skills(conn, user_id, resume_ids)
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    def save(rows):
+        with db_connection() as conn:
+            conn.executemany(
+                "INSERT INTO analysis (user_id, resume_id, target_role, skill_gap_json, roadmap_json, score) VALUES (?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            record_analyses(conn, user_id, [(row[2], row[5]) for row in rows])
+            bump_user_version(conn, user_id)
+            conn.commit()
+
+    def generate():
+        saved = 0
+        for resume_id in resume_ids:
+            skills = skills_by_resume.get(resume_id)
+            if skills is None:
+                yield json.dumps(
+                    {"resume_id": resume_id, "error": "Resume not found"}
+                ) + "\n"
+                continue
+
+            rows = []
+            results = []
+            for target_role in target_roles:
+                gap_analysis, roadmap, courses = run_role_analysis(skills, target_role)
+                rows.append(
+                    (
+                        user_id,
+                        resume_id,
+                        target_role,
+                        compress_text(json.dumps(gap_analysis)),
+                        compress_text(json.dumps(roadmap)),
+                        gap_analysis["score"],
+                    )
+                )
+                results.append(
+                    {
+                        "resume_id": resume_id,
+                        "target_role": target_role,
+                        "gap_analysis": gap_analysis,
+                        "roadmap": roadmap,
+                        "course_recommendations": courses,
+                        "career_level": skills["career_level"],
+                    }
+                )
+
+            # Save each resume's analyses before streaming them, so a client
+            # that disconnects midway keeps everything it already received
+            try:
+                save(rows)
+            except Exception as e:
+                yield json.dumps({"done": True, "saved": saved, "error": str(e)}) + "\n"
+                return
+            saved += len(rows)
+            for result in results:
+                yield json.dumps(result) + "\n"
+
+        yield json.dumps({"done": True, "saved": saved}) + "\n"
+
+    return Response(generate(), mimetype="application/x-ndjson")
+
+
+# Search Resumes by Skill
+@app.route("/api/search/skills", methods=["GET"])
+def search_skills():
+    if "user_id" not in session:
+        return jsonify({"error": "Not authenticated"}), 401
+
+    if session.get("email", "").lower() not in app.config["RECRUITER_EMAILS"]:
+        return jsonify({"error": "Skill search is limited to recruiter accounts"}), 403
+
+    # ?all=python,sql&any=tableau,power bi&limit=20&cursor=<next_cursor>
+    def skill_list(name):
+        return sorted(
+            {
+                skill.strip().lower()
+                for value in request.args.getlist(name)
+                for skill in value.split(",")
+                if skill.strip()
+            }
+        )
+
+    all_skills = skill_list("all")
+    any_skills = skill_list("any")
+    if not all_skills and not any_skills:
+        return jsonify({"error": "Provide skills in 'all' and/or 'any'"}), 400
+    if len(all_skills) + len(any_skills) > 20:
+        return jsonify({"error": "At most 20 skills per search"}), 400
+
+    try:
+        limit = min(
+            int(request.args.get("limit", 20)), app.config["SEARCH_MAX_RESULTS"]
+        )
+        cursor = request.args.get("cursor")
+        cursor = int(cursor) if cursor else None
+    except ValueError:
+        return jsonify({"error": "limit and cursor must be integers"}), 400
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+
+    try:
+        with db_connection() as conn:
+            resume_ids = search_resume_ids(
+                conn, all_skills, any_skills, limit, before=cursor
+            )
+            results = []
+            if resume_ids:
+                placeholders = ",".join("?" * len(resume_ids))
+                terms = all_skills + any_skills
+                matched = {}
+                for resume_id, skill in conn.execute(
+                    f"""SELECT resume_id, skill FROM skill_index
+                        WHERE skill IN ({','.join('?' * len(terms))}) AND resume_id IN ({placeholders})""",
+                    [*terms, *resume_ids],
+                ):
+                    matched.setdefault(resume_id, []).append(skill)
+
+                rows = {
+                    row[0]: row
+                    for row in conn.execute(
+                        f"""SELECT r.id, r.user_id, u.full_name, u.email, r.filename, r.uploaded_at
+                            FROM resumes r JOIN users u ON u.id = r.user_id
+                            WHERE r.id IN ({placeholders})""",
+                        resume_ids,
+                    )
+                }
+                for resume_id in resume_ids:
+                    row = rows[resume_id]
+                    results.append(
+                        {
+                            "resume_id": row[0],
+                            "user_id": row[1],
+                            "full_name": row[2],
+                            "email": row[3],
+                            "filename": row[4],
+                            "uploaded_at": row[5],
+                            "matched_skills": sorted(matched.get(resume_id, [])),
+                        }
+                    )
 
         return jsonify(
             {
                 "success": True,
-                "analysis_id": analysis_id,
-                "gap_analysis": gap_analysis,
-                "roadmap": roadmap,
-                "course_recommendations": courses,
-                "career_level": skills["career_level"],
+                "results": results,
+                "next_cursor": (resume_ids[-1] if len(resume_ids) == limit else None),
             }
         )
 
@@ -1164,6 +2243,165 @@ def analyze():
         return jsonify({"error": str(e)}), 500
 
 
+def fts_query(text):
+    """Quote each word so user input is matched literally (implicit AND)"""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+# Snippet highlight markers, swapped for <mark> after HTML-escaping the text
+SNIPPET_OPEN, SNIPPET_CLOSE = "\x02", "\x03"
+
+
+# Full-Text Search over Resume Text
+@app.route("/api/search/text", methods=["GET"])
+def search_text():
+    if "user_id" not in session:
+        return jsonify({"error": "Not authenticated"}), 401
+
+    # ?q=machine learning&limit=20&offset=0 (syntax=fts for raw FTS5 queries)
+    text = request.args.get("q", "").strip()
+    if not text:
+        return jsonify({"error": "Query 'q' required"}), 400
+    query = text if request.args.get("syntax") == "fts" else fts_query(text)
+
+    try:
+        limit = min(
+            int(request.args.get("limit", 20)), app.config["SEARCH_MAX_RESULTS"]
+        )
+        offset = int(request.args.get("offset", 0))
+    except ValueError:
+        return jsonify({"error": "limit and offset must be integers"}), 400
+    if limit < 1 or offset < 0:
+        return jsonify({"error": "limit must be positive and offset non-negative"}), 400
+
+    # Recruiters search every resume, everyone else only their own. The rowid
+    # restriction lets FTS5 look up the user's rows instead of ranking every
+    # match in the index and discarding other users' afterwards
+    sql = f"""SELECT r.id, r.user_id, u.full_name, r.filename, r.uploaded_at,
+                     bm25(resumes_fts),
+                     snippet(resumes_fts, 0, '{SNIPPET_OPEN}', '{SNIPPET_CLOSE}', '...', 16)
+              FROM resumes_fts
+              JOIN resumes r ON r.id = resumes_fts.rowid
+              JOIN users u ON u.id = r.user_id
+              WHERE resumes_fts MATCH ?"""
+    params = [query]
+    if session.get("email", "").lower() not in app.config["RECRUITER_EMAILS"]:
+        sql += " AND resumes_fts.rowid IN (SELECT id FROM resumes WHERE user_id = ?)"
+        params.append(session["user_id"])
+    # rank is bm25(); ordering by it lets FTS5 return rows already sorted, so
+    # only the page's snippets are built (each decompresses its resume's text)
+    sql += " ORDER BY rank LIMIT ? OFFSET ?"
+
+    try:
+        with db_connection() as conn:
+            rows = conn.execute(sql, [*params, limit, offset]).fetchall()
+    except sqlite3.OperationalError as e:
+        return jsonify({"error": f"Invalid search query: {e}"}), 400
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+    results = [
+        {
+            "resume_id": row[0],
+            "user_id": row[1],
+            "full_name": row[2],
+            "filename": row[3],
+            "uploaded_at": row[4],
+            # bm25() is lower-is-better; flip it so higher scores rank first
+            "score": -row[5],
+            "snippet": html.escape(row[6] or "")
+            .replace(SNIPPET_OPEN, "<mark>")
+            .replace(SNIPPET_CLOSE, "</mark>"),
+        }
+        for row in rows
+    ]
+    return jsonify(
+        {
+            "success": True,
+            "results": results,
+            "next_offset": offset + limit if len(rows) == limit else None,
+        }
+    )
+
+
+def _source_fingerprint():
+    """Hash of the backend modules, which decide what every response contains"""
+    digest = hashlib.sha256()
+    backend_dir = os.path.join(BASE_DIR, "backend")
+    for name in sorted(os.listdir(backend_dir)):
+        if name.endswith(".py"):
+            with open(os.path.join(backend_dir, name), "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+
+# Per-user data version: bumped in the same transaction as every write that
+# changes the dashboard or profile. Their ETag (also the cache key) adds the
+# endpoint, the build and the database's instance id, so neither a deploy
+# that changes the body nor a recreated database can revive an old ETag
+BUILD_ID = (app.config["RELEASE_ID"] or _source_fingerprint())[:12]
+USER_RESPONSE_CACHE = TTLCache(
+    app.config["USER_RESPONSE_CACHE_SIZE"], app.config["USER_RESPONSE_CACHE_TTL"]
+)
+
+
+def _user_response_cache_metrics():
+    stats = USER_RESPONSE_CACHE.stats()
+    return [
+        (
+            f"skilllens_user_response_cache_{name}_total",
+            "counter",
+            f"Dashboard/profile response cache {name}",
+            [({}, stats[name])],
+        )
+        for name in ("hits", "misses", "evictions")
+    ]
+
+
+REGISTRY.add_collector(_user_response_cache_metrics)
+
+
+def bump_user_version(c, user_id):
+    c.execute(
+        "UPDATE users SET data_version = data_version + 1 WHERE id = ?", (user_id,)
+    )
+
+
+def versioned_user_response(name, build):
+    """Answer a per-user GET with 304, a cached body, or ``build(user_id)``
+
+    Checking the version is a primary-key lookup; the queries in ``build``
+    only run when the user's data changed since the last render.
+    """
+    user_id = session["user_id"]
+    with db_connection() as conn:
+        row = conn.execute(
+            """SELECT data_version,
+                      (SELECT value FROM meta WHERE key = 'instance_id')
+               FROM users WHERE id = ?""",
+            (user_id,),
+        ).fetchone()
+    if row is None:
+        return build(user_id)
+
+    etag = f"{name}-{BUILD_ID}-{row[1]}-{user_id}-{row[0]}"
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        body = USER_RESPONSE_CACHE.get(etag)
+        if body is None:
+            response = app.make_response(build(user_id))
+            if response.status_code != 200:
+                return response
+            # Rows read after the version check are at least that new
+            body = response.get_data()
+            USER_RESPONSE_CACHE.put(etag, body)
+        response = Response(body, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
 # Get User Dashboard
 @app.route("/api/dashboard", methods=["GET"])
 def dashboard():
@@ -1171,9 +2409,14 @@ def dashboard():
         return jsonify({"error": "Not authenticated"}), 401
 
     try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        db_path = os.path.join(project_root, "database", "skilllens.db")
-        conn = sqlite3.connect(db_path)
+        return versioned_user_response("dashboard", render_dashboard)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def render_dashboard(user_id):
+    with db_connection() as conn:
         c = conn.cursor()
 
         # Get recent analyses
@@ -1184,7 +2427,7 @@ def dashboard():
                      WHERE a.user_id = ?
                      ORDER BY a.analyzed_at DESC
                      LIMIT 10""",
-            (session["user_id"],),
+            (user_id,),
         )
 
         analyses = []
@@ -1199,9 +2442,100 @@ def dashboard():
                 }
             )
 
-        conn.close()
+    return jsonify({"success": True, "analyses": analyses})
+
+
+# Analysis history, newest first, paginated on (analyzed_at, id)
+def encode_history_cursor(analyzed_at, analysis_id):
+    return base64.urlsafe_b64encode(f"{analyzed_at}|{analysis_id}".encode()).decode()
 
-        return jsonify({"success": True, "analyses": analyses})
+
+def decode_history_cursor(cursor):
+    analyzed_at, analysis_id = (
+        base64.urlsafe_b64decode(cursor.encode()).decode().rsplit("|", 1)
+    )
+    return analyzed_at, int(analysis_id)
+
+
+@app.route("/api/history", methods=["GET"])
+def analysis_history():
+    if "user_id" not in session:
+        return jsonify({"error": "Not authenticated"}), 401
+
+    # ?limit=20&target_role=Data Analyst&min_score=50&max_score=90&cursor=<next_cursor>
+    try:
+        limit = min(
+            int(request.args.get("limit", app.config["HISTORY_PAGE_SIZE"])),
+            app.config["HISTORY_MAX_PAGE_SIZE"],
+        )
+        min_score = request.args.get("min_score", type=int)
+        max_score = request.args.get("max_score", type=int)
+        if "min_score" in request.args and min_score is None:
+            raise ValueError
+        if "max_score" in request.args and max_score is None:
+            raise ValueError
+    except ValueError:
+        return (
+            jsonify({"error": "limit, min_score and max_score must be integers"}),
+            400,
+        )
+    if limit < 1:
+        return jsonify({"error": "limit must be positive"}), 400
+
+    try:
+        cursor = request.args.get("cursor")
+        cursor = decode_history_cursor(cursor) if cursor else None
+    except (ValueError, UnicodeDecodeError):
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    # With a role the scan runs on idx_analysis_user_role_history, otherwise
+    # on idx_analysis_user_history; either way it starts at the cursor
+    conditions = ["a.user_id = ?"]
+    params = [session["user_id"]]
+    target_role = request.args.get("target_role")
+    if target_role:
+        conditions.append("a.target_role = ?")
+        params.append(target_role)
+    if cursor:
+        conditions.append("(a.analyzed_at, a.id) < (?, ?)")
+        params.extend(cursor)
+    if min_score is not None:
+        conditions.append("a.score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        conditions.append("a.score <= ?")
+        params.append(max_score)
+
+    try:
+        with db_connection() as conn:
+            rows = conn.execute(
+                f"""SELECT a.id, a.target_role, a.score, a.analyzed_at, a.resume_id, r.filename
+                    FROM analysis a
+                    LEFT JOIN resumes r ON r.id = a.resume_id
+                    WHERE {" AND ".join(conditions)}
+                    ORDER BY a.analyzed_at DESC, a.id DESC
+                    LIMIT ?""",
+                [*params, limit + 1],
+            ).fetchall()
+
+        analyses = [
+            {
+                "id": row[0],
+                "target_role": row[1],
+                "score": row[2],
+                "date": row[3],
+                "resume_id": row[4],
+                "filename": row[5],
+            }
+            for row in rows[:limit]
+        ]
+        next_cursor = None
+        if len(rows) > limit:
+            next_cursor = encode_history_cursor(rows[limit - 1][3], rows[limit - 1][0])
+
+        return jsonify(
+            {"success": True, "analyses": analyses, "next_cursor": next_cursor}
+        )
 
     except Exception as e:
         return jsonify({"error": str(e)}), 500
@@ -1214,62 +2548,67 @@ def get_profile():
         return jsonify({"error": "Not authenticated"}), 401
 
     try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        db_path = os.path.join(project_root, "database", "skilllens.db")
-        conn = sqlite3.connect(db_path)
+        return versioned_user_response("profile", render_profile)
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+def render_profile(user_id):
+    with db_connection() as conn:
         c = conn.cursor()
 
-        # Get user profile
+        # Get user profile and statistics (maintained by the write paths)
         c.execute(
-            """SELECT id, email, full_name, phone, location, bio, linkedin, github, created_at
-               FROM users WHERE id = ?""",
-            (session["user_id"],),
+            """SELECT u.id, u.email, u.full_name, u.phone, u.location, u.bio, u.linkedin, u.github, u.created_at,
+                      s.user_id, s.resume_count, s.analysis_count, s.score_sum, s.last_activity
+               FROM users u LEFT JOIN user_stats s ON s.user_id = u.id
+               WHERE u.id = ?""",
+            (user_id,),
         )
         user = c.fetchone()
 
         if not user:
             return jsonify({"error": "User not found"}), 404
 
-        # Get statistics
-        c.execute(
-            "SELECT COUNT(*) FROM resumes WHERE user_id = ?", (session["user_id"],)
-        )
-        resume_count = c.fetchone()[0]
-
-        c.execute(
-            "SELECT COUNT(*), AVG(score) FROM analysis WHERE user_id = ?",
-            (session["user_id"],),
-        )
-        stats = c.fetchone()
-        analysis_count = stats[0]
-        avg_score = int(stats[1]) if stats[1] else 0
-
-        conn.close()
-
-        return jsonify(
-            {
-                "success": True,
-                "profile": {
-                    "id": user[0],
-                    "email": user[1],
-                    "full_name": user[2],
-                    "phone": user[3],
-                    "location": user[4],
-                    "bio": user[5],
-                    "linkedin": user[6],
-                    "github": user[7],
-                    "created_at": user[8],
-                },
-                "stats": {
-                    "resume_count": resume_count,
-                    "analysis_count": analysis_count,
-                    "avg_score": avg_score,
-                },
-            }
-        )
+        if user[9] is not None:
+            resume_count, analysis_count, score_sum, last_activity = user[10:]
+            c.execute(
+                "SELECT target_role, best_score FROM user_role_scores WHERE user_id = ?",
+                (user_id,),
+            )
+            best_scores = dict(c.fetchall())
+        else:
+            # Registered before migration 10 and not backfilled yet
+            resume_count, analysis_count, score_sum, last_activity, best_scores = (
+                live_stats(c, user_id)
+            )
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    avg_score = int(score_sum / analysis_count) if analysis_count else 0
+
+    return jsonify(
+        {
+            "success": True,
+            "profile": {
+                "id": user[0],
+                "email": user[1],
+                "full_name": user[2],
+                "phone": user[3],
+                "location": user[4],
+                "bio": user[5],
+                "linkedin": user[6],
+                "github": user[7],
+                "created_at": user[8],
+            },
+            "stats": {
+                "resume_count": resume_count,
+                "analysis_count": analysis_count,
+                "avg_score": avg_score,
+                "best_scores": best_scores,
+                "last_activity": last_activity,
+            },
+        }
+    )
 
 
 # Update User Profile
@@ -1291,37 +2630,35 @@ def update_profile():
         return jsonify({"error": "Full name and email are required"}), 400
 
     try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        db_path = os.path.join(project_root, "database", "skilllens.db")
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
-
-        # Check if email is already taken by another user
-        c.execute(
-            "SELECT id FROM users WHERE email = ? AND id != ?",
-            (email, session["user_id"]),
-        )
-        if c.fetchone():
-            return jsonify({"error": "Email already in use"}), 400
+        with db_connection() as conn:
+            c = conn.cursor()
 
-        # Update user profile
-        c.execute(
-            """UPDATE users
-               SET full_name = ?, email = ?, phone = ?, location = ?, bio = ?, linkedin = ?, github = ?
-               WHERE id = ?""",
-            (
-                full_name,
-                email,
-                phone,
-                location,
-                bio,
-                linkedin,
-                github,
-                session["user_id"],
-            ),
-        )
-        conn.commit()
-        conn.close()
+            # Check if email is already taken by another user
+            c.execute(
+                "SELECT id FROM users WHERE email = ? AND id != ?",
+                (email, session["user_id"]),
+            )
+            if c.fetchone():
+                return jsonify({"error": "Email already in use"}), 400
+
+            # Update user profile
+            c.execute(
+                """UPDATE users
+                   SET full_name = ?, email = ?, phone = ?, location = ?, bio = ?, linkedin = ?, github = ?
+                   WHERE id = ?""",
+                (
+                    full_name,
+                    email,
+                    phone,
+                    location,
+                    bio,
+                    linkedin,
+                    github,
+                    session["user_id"],
+                ),
+            )
+            bump_user_version(c, session["user_id"])
+            conn.commit()
 
         # Update session
         session["full_name"] = full_name
@@ -1350,29 +2687,31 @@ def change_password():
         return jsonify({"error": "Password must be at least 6 characters"}), 400
 
     try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        db_path = os.path.join(project_root, "database", "skilllens.db")
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
+        with db_connection() as conn:
+            c = conn.cursor()
+            c.execute("SELECT password FROM users WHERE id = ?", (session["user_id"],))
+            user = c.fetchone()
 
         # Verify current password
-        c.execute("SELECT password FROM users WHERE id = ?", (session["user_id"],))
-        user = c.fetchone()
-
-        if not user or not check_password_hash(user[0], current_password):
+        if not user or not password_hasher.verify(user[0], current_password):
             return jsonify({"error": "Current password is incorrect"}), 401
 
-        # Update password
-        hashed_password = generate_password_hash(new_password)
-        c.execute(
-            "UPDATE users SET password = ? WHERE id = ?",
-            (hashed_password, session["user_id"]),
-        )
-        conn.commit()
-        conn.close()
+        # Update password, unless it changed while we were hashing
+        hashed_password = password_hasher.hash(new_password)
+        with db_connection() as conn:
+            c = conn.cursor()
+            c.execute(
+                "UPDATE users SET password = ? WHERE id = ? AND password = ?",
+                (hashed_password, session["user_id"], user[0]),
+            )
+            conn.commit()
+            if not c.rowcount:
+                return jsonify({"error": "Current password is incorrect"}), 401
 
         return jsonify({"success": True, "message": "Password updated successfully"})
 
+    except PasswordHashBusy:
+        return password_hash_busy()
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -1384,30 +2723,105 @@ def delete_account():
         return jsonify({"error": "Not authenticated"}), 401
 
     try:
-        project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-        db_path = os.path.join(project_root, "database", "skilllens.db")
-        conn = sqlite3.connect(db_path)
-        c = conn.cursor()
+        with db_connection() as conn:
+            c = conn.cursor()
+
+            # Delete user's analyses
+            c.execute("DELETE FROM analysis WHERE user_id = ?", (session["user_id"],))
+
+            # Delete user's background jobs; workers skip jobs that are gone,
+            # and one already running finds the account missing when it saves
+            c.execute(
+                """SELECT DISTINCT json_extract(payload_json, '$.content_hash')
+                   FROM jobs WHERE user_id = ? AND kind = 'resume'""",
+                (session["user_id"],),
+            )
+            job_uploads = [row[0] for row in c.fetchall() if row[0]]
+            c.execute("DELETE FROM jobs WHERE user_id = ?", (session["user_id"],))
+
+            # Release the user's references to stored uploads
+            c.execute(
+                """SELECT content_hash, COUNT(*) FROM resumes
+                   WHERE user_id = ? AND content_hash IS NOT NULL
+                   GROUP BY content_hash""",
+                (session["user_id"],),
+            )
+            for content_hash, references in c.fetchall():
+                c.execute(
+                    "UPDATE resume_blobs SET ref_count = ref_count - ? WHERE sha256 = ?",
+                    (references, content_hash),
+                )
+            c.execute("SELECT stored_filename FROM resume_blobs WHERE ref_count <= 0")
+            orphaned_files = [row[0] for row in c.fetchall()]
+            c.execute("DELETE FROM resume_blobs WHERE ref_count <= 0")
+
+            # Originals stored for jobs that never saved a resume have no blob row
+            for content_hash in job_uploads:
+                c.execute(
+                    "SELECT 1 FROM resume_blobs WHERE sha256 = ?", (content_hash,)
+                )
+                if not c.fetchone() and blob_key(content_hash) not in orphaned_files:
+                    orphaned_files.append(blob_key(content_hash))
+
+            # Uploads from before content hashing were stored per resume
+            c.execute(
+                "SELECT filename FROM resumes WHERE user_id = ? AND content_hash IS NULL",
+                (session["user_id"],),
+            )
+            orphaned_files += [row[0] for row in c.fetchall()]
 
-        # Delete user's analyses
-        c.execute("DELETE FROM analysis WHERE user_id = ?", (session["user_id"],))
+            # Delete user's resumes, their skill rows and search postings
+            c.execute("SELECT id FROM resumes WHERE user_id = ?", (session["user_id"],))
+            remove_resume_skills(c, [row[0] for row in c.fetchall()])
+            c.execute("DELETE FROM resumes WHERE user_id = ?", (session["user_id"],))
 
-        # Delete user's resumes
-        c.execute("DELETE FROM resumes WHERE user_id = ?", (session["user_id"],))
+            # Delete user and their statistics
+            forget_user(c, session["user_id"])
+            c.execute("DELETE FROM users WHERE id = ?", (session["user_id"],))
 
-        # Delete user
-        c.execute("DELETE FROM users WHERE id = ?", (session["user_id"],))
+            conn.commit()
 
-        conn.commit()
-        conn.close()
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
 
-        # Clear session
-        session.clear()
+    # The account is gone once committed; a file left behind is only logged
+    for stored_filename in orphaned_files:
+        try:
+            storage.delete(stored_filename)
+        except Exception:
+            app.logger.exception("Could not delete stored upload %s", stored_filename)
 
-        return jsonify({"success": True, "message": "Account deleted successfully"})
+    # Clear session
+    session.clear()
 
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+    return jsonify({"success": True, "message": "Account deleted successfully"})
+
+
+# ==================== BACKGROUND WORKERS ====================
+
+_background_lock = threading.Lock()
+_background_started = False
+
+
+def start_background_workers():
+    """Start the job queue and re-extractor in a process that serves requests
+
+    Called from gunicorn's ``post_worker_init`` hook (gunicorn.conf.py) and by
+    the development server, never at import, so scripts that import this
+    module (ingest.py, the benchmarks) start no threads.
+    """
+    global _background_started
+    with _background_lock:
+        if _background_started:
+            return
+        _background_started = True
+
+    # Pick up jobs left queued or orphaned by dead workers, now and periodically
+    job_queue.start()
+
+    # Bring resumes extracted under an older vocabulary up to date
+    if app.config["REEXTRACT_ON_STARTUP"]:
+        reextractor.start()
 
 
 # ==================== RUN SERVER ====================
@@ -1423,6 +2837,10 @@ if __name__ == "__main__":
     # Initialize database
     init_db()
 
+    # With the reloader, only the child process that serves requests runs them
+    if is_running_from_reloader():
+        start_background_workers()
+
     # Run Flask app
     print("=" * 50)
     print("🧠 SkillLens AI - Career Intelligence Platform")
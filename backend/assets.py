@@ -0,0 +1,173 @@
+"""In-memory manifest of the frontend's static files.
+
+``AssetManifest`` scans ``frontend/`` and ``static/`` once at startup and
+keeps every file in memory with its SHA-256, so serving one needs no
+filesystem access. Each asset is also reachable under a fingerprinted URL
+(``static/js/dashboard.3f2a1b9c.js``) that is cached as immutable; the HTML
+pages are rewritten to reference those URLs and are revalidated with a strong
+ETag on every load.
+
+Compressed variants are produced by the build step (``python assets.py``),
+which writes ``<sha256>.gz`` (and ``.br`` when the ``brotli`` package is
+installed) into the build directory. Naming variants by content hash means a
+stale build is simply ignored; files without a prebuilt gzip variant are
+compressed once at startup instead.
+"""
+
+import argparse
+import gzip
+import hashlib
+import mimetypes
+import os
+import re
+
+try:
+    import brotli
+except ImportError:  # optional, only used by the build step
+    brotli = None
+
+FINGERPRINT_LENGTH = 8
+# Smaller files are not worth a compressed variant
+COMPRESS_MIN_BYTES = 512
+COMPRESSIBLE_TYPES = ("text/", "application/javascript", "application/json")
+IMMUTABLE = "public, max-age=31536000, immutable"
+REVALIDATE = "no-cache"
+# Preference order when the client accepts several encodings
+ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+STATIC_REFERENCE = re.compile(r"""(["'])(?:\./|/)?(static/[^"'?#]+)\1""")
+
+
+class Asset:
+    def __init__(self, path, body, mimetype):
+        self.path = path
+        self.body = body
+        self.mimetype = mimetype
+        self.sha256 = hashlib.sha256(body).hexdigest()
+        self.etag = self.sha256[:32]
+        self.variants = {}  # encoding -> compressed body
+
+    @property
+    def fingerprinted_path(self):
+        root, ext = os.path.splitext(self.path)
+        return f"{root}.{self.sha256[:FINGERPRINT_LENGTH]}{ext}"
+
+    @property
+    def compressible(self):
+        return len(self.body) >= COMPRESS_MIN_BYTES and self.mimetype.startswith(
+            COMPRESSIBLE_TYPES
+        )
+
+    def select(self, accept_encodings):
+        """Return (encoding or None, body, etag) for the client's Accept-Encoding"""
+        for encoding, _ in ENCODINGS:
+            if encoding in self.variants and accept_encodings[encoding] > 0:
+                return encoding, self.variants[encoding], f"{self.etag}-{encoding}"
+        return None, self.body, self.etag
+
+
+def _guess_type(path):
+    return mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def _scan(directory):
+    for dirpath, dirnames, filenames in os.walk(directory):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith("."))
+        for filename in sorted(filenames):
+            if filename.startswith("."):
+                continue
+            full_path = os.path.join(dirpath, filename)
+            relative = os.path.relpath(full_path, directory).replace(os.sep, "/")
+            with open(full_path, "rb") as f:
+                yield relative, f.read()
+
+
+class AssetManifest:
+    def __init__(self, base_dir, build_dir=None):
+        # URL path (no leading slash) -> Asset. Files under static/ are also
+        # served without the prefix, and frontend/ wins on a clash, as the
+        # old per-request lookup did
+        self.assets = {}
+        for path, body in _scan(os.path.join(base_dir, "static")):
+            asset = Asset("static/" + path, body, _guess_type(path))
+            self.assets[asset.path] = self.assets[path] = asset
+        for path, body in _scan(os.path.join(base_dir, "frontend")):
+            self.assets[path] = Asset(path, body, _guess_type(path))
+
+        # HTML references the fingerprinted URLs, so it is hashed afterwards
+        for path, asset in list(self.assets.items()):
+            if asset.mimetype == "text/html":
+                self.assets[path] = self._rewrite_references(asset)
+
+        self.fingerprinted = {
+            asset.fingerprinted_path: asset
+            for asset in self.assets.values()
+            if asset.path.startswith("static/")
+        }
+        for asset in self.unique_assets():
+            self._load_variants(asset, build_dir)
+
+    def unique_assets(self):
+        return list({id(asset): asset for asset in self.assets.values()}.values())
+
+    def _rewrite_references(self, asset):
+        def replace(match):
+            target = self.assets.get(match.group(2))
+            if target is None:
+                return match.group(0)
+            return f"{match.group(1)}/{target.fingerprinted_path}{match.group(1)}"
+
+        text = STATIC_REFERENCE.sub(replace, asset.body.decode("utf-8"))
+        return Asset(asset.path, text.encode("utf-8"), asset.mimetype)
+
+    def _load_variants(self, asset, build_dir):
+        if not asset.compressible:
+            return
+        for encoding, suffix in ENCODINGS:
+            if build_dir:
+                variant_path = os.path.join(build_dir, asset.sha256 + suffix)
+                if os.path.exists(variant_path):
+                    with open(variant_path, "rb") as f:
+                        asset.variants[encoding] = f.read()
+        if "gzip" not in asset.variants:
+            asset.variants["gzip"] = gzip.compress(asset.body, 9, mtime=0)
+
+    def lookup(self, path):
+        """Return (asset, Cache-Control value) for a URL path; asset may be None"""
+        asset = self.fingerprinted.get(path)
+        if asset is not None:
+            return asset, IMMUTABLE
+        return self.assets.get(path), REVALIDATE
+
+
+def build(base_dir, build_dir):
+    """Write compressed variants for every compressible asset"""
+    os.makedirs(build_dir, exist_ok=True)
+    manifest = AssetManifest(base_dir)
+    written = 0
+    for asset in manifest.unique_assets():
+        if not asset.compressible:
+            continue
+        variants = {".gz": asset.variants["gzip"]}
+        if brotli is not None:
+            variants[".br"] = brotli.compress(asset.body, quality=11)
+        for suffix, body in variants.items():
+            with open(os.path.join(build_dir, asset.sha256 + suffix), "wb") as f:
+                f.write(body)
+            written += 1
+    return written
+
+
+if __name__ == "__main__":
+    base_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    parser = argparse.ArgumentParser(description="Precompress static assets")
+    parser.add_argument(
+        "--out",
+        default=os.environ.get(
+            "ASSET_BUILD_DIR", os.path.join(base_dir, "build", "static")
+        ),
+    )
+    args = parser.parse_args()
+    count = build(base_dir, args.out)
+    print(f"Wrote {count} compressed variants to {args.out}")
+    if brotli is None:
+        print("brotli not installed; only gzip variants were written")
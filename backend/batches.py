@@ -0,0 +1,57 @@
+"""Id-range batching shared by the offline maintenance scripts.
+
+``rebuild_search.py``, ``user_stats.py`` and ``compact_storage.py`` walk a
+table in id ranges, each written in its own short ``BEGIN IMMEDIATE``
+transaction with a pause in between, so they can run against a live database
+without holding the write lock for long. Nothing here imports ``app``, so the
+scripts start no background threads.
+"""
+
+import os
+import time
+
+from db import DB_PATH, db_connection
+from migrations import migrate
+
+
+def add_batch_arguments(parser, batch_size=500):
+    parser.add_argument("--batch-size", type=int, default=batch_size)
+    parser.add_argument(
+        "--pause", type=float, default=0.05, help="seconds between batches"
+    )
+
+
+def prepare_database():
+    """Create the database if needed and bring its schema up to date"""
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    with db_connection() as conn:
+        migrate(conn)
+
+
+def id_ranges(table, batch_size, key="id"):
+    """Inclusive (low, high) ranges of ``key`` covering ``table`` as it is now"""
+    with db_connection() as conn:
+        (last_id,) = conn.execute(
+            f"SELECT COALESCE(MAX({key}), 0) FROM {table}"
+        ).fetchone()
+    for low in range(0, last_id + 1, batch_size):
+        yield low, min(low + batch_size - 1, last_id)
+
+
+def run_batches(table, batch_size, pause, work, label, key="id"):
+    """Call ``work(cursor, low, high)`` for each id range of ``table``
+
+    Each call gets its own write transaction; ``work`` returns the number of
+    rows it handled, and the total is returned.
+    """
+    started = time.perf_counter()
+    done = 0
+    for low, high in id_ranges(table, batch_size, key):
+        with db_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            done += work(conn.cursor(), low, high)
+            conn.commit()
+        print(f"\r{label} {done} rows (up to {table} {key} {high})", end="")
+        time.sleep(pause)
+    print(f"\n{label} {done} rows in {time.perf_counter() - started:.1f}s")
+    return done
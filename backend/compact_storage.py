@@ -0,0 +1,74 @@
+"""Compress resume text and analysis JSON written before compression existed.
+
+Since migration 5, large text and JSON values are stored as zlib-compressed
+BLOBs, but rows written earlier keep their plain TEXT until this script
+rewrites them. It works in id ranges, each in its own short transaction, so
+it is safe to interrupt, run again, and run on a live database. Rewriting
+resume text also refreshes those rows in the full-text index.
+
+SQLite does not shrink the file by itself; run ``VACUUM`` off-peak afterwards.
+
+Usage: python compact_storage.py [--batch-size 500] [--pause 0.05]
+"""
+
+import argparse
+
+from batches import add_batch_arguments, prepare_database, run_batches
+from db import COMPRESS_MIN_BYTES, compress_text, decompress_text
+
+# table -> (key, columns)
+COMPRESSED_COLUMNS = {
+    "resumes": ("id", ("extracted_text", "skills_json")),
+    "resume_blobs": ("rowid", ("extracted_text", "skills_json")),
+    "analysis": ("id", ("skill_gap_json", "roadmap_json")),
+}
+
+
+def compact_range(table, key, columns):
+    """Batch callback rewriting the range's uncompressed values of ``columns``"""
+    uncompressed = " OR ".join(
+        f"(typeof({column}) = 'text' AND length(CAST({column} AS BLOB)) >= :min)"
+        for column in columns
+    )
+
+    def work(c, low, high):
+        rows = c.execute(
+            f"""SELECT {key}, {', '.join(columns)} FROM {table}
+                WHERE {key} BETWEEN :low AND :high AND ({uncompressed})""",
+            {"low": low, "high": high, "min": COMPRESS_MIN_BYTES},
+        ).fetchall()
+        c.executemany(
+            f"UPDATE {table} SET {', '.join(f'{col} = ?' for col in columns)} WHERE {key} = ?",
+            [
+                (*(compress_text(decompress_text(value)) for value in row[1:]), row[0])
+                for row in rows
+            ],
+        )
+        return len(rows)
+
+    return work
+
+
+def compact(batch_size, pause):
+    for table, (key, columns) in COMPRESSED_COLUMNS.items():
+        run_batches(
+            table,
+            batch_size,
+            pause,
+            compact_range(table, key, columns),
+            f"{table}: compressed",
+            key=key,
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+
+    prepare_database()
+    compact(args.batch_size, args.pause)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""SQLite access layer shared by the web app, background jobs and scripts.
+
+Connections are opened once with the tuning pragmas below and kept in a small
+per-process pool. ``db_connection()`` checks one out for the duration of a
+``with`` block and always hands it back, rolling back anything left
+uncommitted (early returns, exceptions), so no code path leaks a connection or
+holds the write lock.
+"""
+
+import os
+import queue
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DB_PATH = os.environ.get(
+    "DATABASE_PATH", os.path.join(BASE_DIR, "database", "skilllens.db")
+)
+POOL_SIZE = int(os.environ.get("DATABASE_POOL_SIZE", 8))
+BUSY_TIMEOUT_SECONDS = 10
+# zlib level for large TEXT values (0 stores them uncompressed)
+COMPRESSION_LEVEL = int(os.environ.get("DATABASE_COMPRESSION_LEVEL", 6))
+COMPRESS_MIN_BYTES = 256
+
+# WAL lets readers run alongside the single writer across gunicorn workers
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-16000",  # 16 MB page cache per connection
+    "PRAGMA mmap_size=134217728",  # 128 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+# Resume text and JSON payloads are stored as zlib-compressed BLOBs; values
+# read back as str (small, or written before compression) pass through as-is
+def compress_text(text):
+    if text is None or not COMPRESSION_LEVEL:
+        return text
+    data = text.encode()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return text
+    return zlib.compress(data, COMPRESSION_LEVEL)
+
+
+def decompress_text(value):
+    if isinstance(value, bytes):
+        return zlib.decompress(value).decode()
+    return value
+
+
+def register_functions(conn):
+    """SQL functions used by triggers (the full-text index reads resume text)
+
+    The ``resumes`` triggers and the ``resumes_text`` view behind the index
+    call ``decompress_text``, so writing resumes or building search snippets
+    fails with "no such function" on a connection without it, such as the
+    ``sqlite3`` shell; pooled connections always have it.
+    """
+    conn.create_function("decompress_text", 1, decompress_text, deterministic=True)
+
+
+# Optional callback(sql, seconds) invoked after every statement (see metrics.py)
+_statement_observer = None
+
+
+def set_statement_observer(observer):
+    global _statement_observer
+    _statement_observer = observer
+
+
+class TimedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement's execution time to the observer"""
+
+    def execute(self, sql, parameters=()):
+        if _statement_observer is None:
+            return super().execute(sql, parameters)
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            _statement_observer(sql, time.perf_counter() - start)
+
+    def executemany(self, sql, seq_of_parameters):
+        if _statement_observer is None:
+            return super().executemany(sql, seq_of_parameters)
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            _statement_observer(sql, time.perf_counter() - start)
+
+
+class TimedConnection(sqlite3.Connection):
+    # sqlite3.Connection.execute does not go through cursor(), so route the
+    # shortcuts explicitly to keep every statement observable
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+class ConnectionPool:
+    def __init__(self, db_path, size=POOL_SIZE):
+        self.db_path = db_path
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def _open(self):
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=BUSY_TIMEOUT_SECONDS,
+            check_same_thread=False,
+            factory=TimedConnection,
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        register_functions(conn)
+        return conn
+
+    def _check_fork(self):
+        # SQLite handles must not cross fork(); a forked worker starts empty
+        if os.getpid() != self._pid:
+            with self._lock:
+                if os.getpid() != self._pid:
+                    self._idle = queue.LifoQueue()
+                    self._pid = os.getpid()
+
+    def acquire(self):
+        self._check_fork()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._open()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if os.getpid() != self._pid or self._idle.qsize() >= self.size:
+            conn.close()
+        else:
+            self._idle.put(conn)
+
+    def close_all(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+
+pool = ConnectionPool(DB_PATH)
+
+
+def db_connection():
+    """Check a pooled connection out for a ``with`` block"""
+    return pool.connection()
@@ -0,0 +1,15 @@
+"""Gunicorn settings, picked up automatically when gunicorn starts in backend/"""
+
+import os
+
+# Threaded workers keep serving other requests while one waits on password
+# hashing, PDF extraction or the database
+worker_class = "gthread"
+threads = int(os.environ.get("GUNICORN_THREADS", 4))
+
+
+def post_worker_init(worker):
+    # Background threads run in serving workers only, never on import of app
+    from app import start_background_workers
+
+    start_background_workers()
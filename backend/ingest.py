@@ -0,0 +1,255 @@
+"""Bulk resume ingestion for cohort onboarding.
+
+Reads PDFs from a directory or a .zip, parses them across a process pool and
+writes resumes in batched transactions, bypassing the web workers entirely.
+A CSV manifest maps each file to an existing account::
+
+    filename,email
+    alice.pdf,alice@college.edu
+    cse/bob.pdf,bob@college.edu
+
+(a ``user_id`` column may be used instead of ``email``). Every processed file
+is recorded in ``ingest_log`` in the same transaction as its resume row, so an
+interrupted run can simply be started again and skips what is already done.
+
+Usage: python ingest.py SOURCE --manifest users.csv [--workers 4] [--batch-size 100]
+"""
+
+import argparse
+import csv
+import hashlib
+import io
+import json
+import os
+import sys
+import time
+import zipfile
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+from werkzeug.utils import secure_filename
+
+from app import (
+    SKILL_VOCABULARY_VERSION,
+    blob_key,
+    bump_user_version,
+    extract_skills_from_resume,
+    init_db,
+    storage,
+    store_resume_skills,
+    stream_pdf_text,
+)
+from db import compress_text, db_connection
+from user_stats import record_resumes
+
+
+def read_manifest(manifest_path):
+    """Return {member: (email, user_id)} from the CSV manifest"""
+    entries = {}
+    with open(manifest_path, newline="") as file:
+        for row in csv.DictReader(file):
+            member = row["filename"].strip()
+            user_id = row.get("user_id", "").strip()
+            entries[member] = (
+                row.get("email", "").strip().lower() or None,
+                int(user_id) if user_id else None,
+            )
+    return entries
+
+
+def resolve_users(entries):
+    """Map manifest entries to user ids; unknown accounts map to None"""
+    emails = sorted({email for email, _ in entries.values() if email})
+    by_email = {}
+    with db_connection() as conn:
+        for start in range(0, len(emails), 500):
+            chunk = emails[start : start + 500]
+            rows = conn.execute(
+                f"SELECT lower(email), id FROM users WHERE lower(email) IN ({','.join('?' * len(chunk))})",
+                chunk,
+            ).fetchall()
+            by_email.update(rows)
+        known_ids = {row[0] for row in conn.execute("SELECT id FROM users")}
+
+    resolved = {}
+    for member, (email, user_id) in entries.items():
+        if email:
+            user_id = by_email.get(email)
+        resolved[member] = user_id if user_id in known_ids else None
+    return resolved
+
+
+def read_member(source, member):
+    if zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            return archive.read(member)
+    with open(os.path.join(source, member), "rb") as file:
+        return file.read()
+
+
+def parse_member(source, member):
+    """Worker: store the PDF by content hash and extract its text and skills"""
+    data = read_member(source, member)
+    extracted_text = "".join(stream_pdf_text(io.BytesIO(data)))
+    skills = extract_skills_from_resume(extracted_text)
+
+    content_hash = hashlib.sha256(data).hexdigest()
+    stored_filename = blob_key(content_hash)
+    if not storage.exists(stored_filename):
+        storage.put(stored_filename, io.BytesIO(data))
+
+    return (
+        content_hash,
+        stored_filename,
+        compress_text(extracted_text),
+        compress_text(json.dumps(skills)),
+        skills,
+    )
+
+
+def write_batch(batch_key, batch):
+    """Insert one batch of parsed resumes and their ingest_log rows atomically"""
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.executemany(
+            """INSERT OR IGNORE INTO resume_blobs (sha256, stored_filename, extracted_text, skills_json, vocabulary_version)
+               VALUES (?, ?, ?, ?, ?)""",
+            [(*parsed[:4], SKILL_VOCABULARY_VERSION) for _, _, parsed in batch],
+        )
+        c.executemany(
+            "UPDATE resume_blobs SET ref_count = ref_count + 1 WHERE sha256 = ?",
+            [(parsed[0],) for _, _, parsed in batch],
+        )
+        for member, user_id, (content_hash, _, text, skills_json, skills) in batch:
+            c.execute(
+                """INSERT INTO resumes (user_id, filename, extracted_text, skills_json, content_hash, career_level, experience_years, vocabulary_version)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    user_id,
+                    f"{user_id}_{timestamp}_{secure_filename(os.path.basename(member))}",
+                    text,
+                    skills_json,
+                    content_hash,
+                    skills["career_level"],
+                    skills["experience_years"],
+                    SKILL_VOCABULARY_VERSION,
+                ),
+            )
+            store_resume_skills(c, c.lastrowid, skills)
+        for user_id, count in Counter(user_id for _, user_id, _ in batch).items():
+            record_resumes(c, user_id, count)
+            bump_user_version(c, user_id)
+        c.executemany(
+            """INSERT OR REPLACE INTO ingest_log (batch_key, member, user_id, status)
+               VALUES (?, ?, ?, 'done')""",
+            [(batch_key, member, user_id) for member, user_id, _ in batch],
+        )
+        conn.commit()
+
+
+def record_failures(batch_key, failures):
+    with db_connection() as conn:
+        conn.executemany(
+            """INSERT OR REPLACE INTO ingest_log (batch_key, member, user_id, status, error)
+               VALUES (?, ?, ?, 'failed', ?)""",
+            [
+                (batch_key, member, user_id, error)
+                for member, user_id, error in failures
+            ],
+        )
+        conn.commit()
+
+
+def ingest(source, manifest_path, workers, batch_size, batch_key=None):
+    source = os.path.abspath(source)
+    batch_key = batch_key or source
+
+    users = resolve_users(read_manifest(manifest_path))
+    with db_connection() as conn:
+        done = {
+            row[0]
+            for row in conn.execute(
+                "SELECT member FROM ingest_log WHERE batch_key = ? AND status = 'done'",
+                (batch_key,),
+            )
+        }
+
+    failures = [
+        (member, None, "No matching user account")
+        for member, user_id in users.items()
+        if user_id is None and member not in done
+    ]
+    pending = [
+        (member, user_id)
+        for member, user_id in sorted(users.items())
+        if user_id is not None and member not in done
+    ]
+    print(
+        f"{len(pending)} to ingest, {len(done)} already done, {len(failures)} unmatched"
+    )
+
+    started = time.perf_counter()
+    ingested = 0
+    batch = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(parse_member, source, member): (member, user_id)
+            for member, user_id in pending
+        }
+        for future in as_completed(futures):
+            member, user_id = futures[future]
+            try:
+                batch.append((member, user_id, future.result()))
+            except Exception as e:
+                failures.append((member, user_id, str(e)))
+
+            if len(batch) >= batch_size:
+                write_batch(batch_key, batch)
+                ingested += len(batch)
+                batch = []
+                elapsed = time.perf_counter() - started
+                print(
+                    f"  {ingested}/{len(pending)} ingested, {ingested / elapsed:.1f} docs/sec"
+                )
+
+        if batch:
+            write_batch(batch_key, batch)
+            ingested += len(batch)
+
+    if failures:
+        record_failures(batch_key, failures)
+
+    elapsed = time.perf_counter() - started
+    rate = ingested / elapsed if elapsed else 0.0
+    print(f"ingested {ingested} resumes in {elapsed:.1f}s ({rate:.1f} docs/sec)")
+    if failures:
+        print(f"{len(failures)} failed:")
+        for member, _, error in failures:
+            print(f"  {member}: {error}")
+    return ingested, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Bulk-ingest resume PDFs from a directory or zip"
+    )
+    parser.add_argument("source", help="directory or .zip containing PDFs")
+    parser.add_argument("--manifest", required=True, help="CSV: filename,email")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 2)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument(
+        "--batch-name", help="resume key for this run (defaults to the source path)"
+    )
+    args = parser.parse_args()
+
+    init_db()
+    _, failures = ingest(
+        args.source, args.manifest, args.workers, args.batch_size, args.batch_name
+    )
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Local background job queue persisted in SQLite.
+
+Jobs are rows in the ``jobs`` table and run on a thread pool inside each
+worker process, so no external broker is needed. A job is claimed with an
+atomic ``queued -> running`` update, which lets several gunicorn workers
+recover the same table after a restart without running a job twice.
+
+While a process runs, a sweeper thread heartbeats the jobs it is working on
+and periodically requeues running jobs whose heartbeat went stale (their
+worker was killed), so they are picked up without waiting for a restart.
+"""
+
+import json
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+# Running jobs are heartbeated this often; one whose heartbeat is older than
+# STALE_AFTER_SECONDS is assumed to belong to a dead worker
+SWEEP_INTERVAL_SECONDS = 30
+STALE_AFTER_SECONDS = 120
+
+
+class JobQueue:
+    def __init__(self, connection, workers=2):
+        # ``connection`` is a factory returning a context-managed DB connection
+        self._connection = connection
+        self.workers = workers
+        self._handlers = {}
+        self._executor = None
+        self._lock = threading.Lock()
+        # Jobs scheduled or running in this process
+        self._active = set()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def register(self, kind, handler):
+        """Register the callable that runs jobs of ``kind`` with their payload"""
+        self._handlers[kind] = handler
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="job"
+                )
+            return self._executor
+
+    def _schedule(self, job_id):
+        with self._lock:
+            if job_id in self._active:
+                return False
+            self._active.add(job_id)
+        self._get_executor().submit(self._run, job_id)
+        return True
+
+    def submit(self, kind, user_id, payload):
+        """Persist a new job and schedule it; returns the job id"""
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        job_id = uuid.uuid4().hex
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT INTO jobs (id, user_id, kind, status, payload_json) VALUES (?, ?, ?, 'queued', ?)",
+                (job_id, user_id, kind, json.dumps(payload)),
+            )
+            conn.commit()
+
+        self._schedule(job_id)
+        return job_id
+
+    def get(self, job_id, user_id):
+        """Return a job owned by ``user_id`` as a dict, or None"""
+        with self._connection() as conn:
+            row = conn.execute(
+                """SELECT id, kind, status, result_json, error, created_at, updated_at
+                   FROM jobs WHERE id = ? AND user_id = ?""",
+                (job_id, user_id),
+            ).fetchone()
+
+        if not row:
+            return None
+        return {
+            "id": row[0],
+            "kind": row[1],
+            "status": row[2],
+            "result": json.loads(row[3]) if row[3] else None,
+            "error": row[4],
+            "created_at": row[5],
+            "updated_at": row[6],
+        }
+
+    def start(self):
+        """Recover left-over jobs and keep sweeping for orphaned ones"""
+        self.recover()
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._sweep_loop, name="job-sweeper", daemon=True
+                )
+                self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def _sweep_loop(self):
+        while not self._stop.wait(SWEEP_INTERVAL_SECONDS):
+            try:
+                self._heartbeat()
+                self.recover()
+            except Exception:
+                # Transient errors (e.g. a locked database): retry next sweep
+                pass
+
+    def _heartbeat(self):
+        with self._lock:
+            job_ids = list(self._active)
+        if not job_ids:
+            return
+        with self._connection() as conn:
+            conn.executemany(
+                """UPDATE jobs SET updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND status = 'running'""",
+                [(job_id,) for job_id in job_ids],
+            )
+            conn.commit()
+
+    def recover(self):
+        """Requeue stale running jobs and schedule every queued one"""
+        with self._connection() as conn:
+            conn.execute(
+                """UPDATE jobs SET status = 'queued', updated_at = CURRENT_TIMESTAMP
+                   WHERE status = 'running' AND updated_at < datetime('now', ?)""",
+                (f"-{STALE_AFTER_SECONDS} seconds",),
+            )
+            conn.commit()
+            pending = conn.execute(
+                "SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at"
+            ).fetchall()
+
+        return sum(self._schedule(job_id) for (job_id,) in pending)
+
+    def _run(self, job_id):
+        try:
+            self._claim_and_run(job_id)
+        finally:
+            with self._lock:
+                self._active.discard(job_id)
+
+    def _claim_and_run(self, job_id):
+        with self._connection() as conn:
+            # Claim the job; another worker may already have picked it up
+            claimed = conn.execute(
+                """UPDATE jobs SET status = 'running', updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ? AND status = 'queued'""",
+                (job_id,),
+            ).rowcount
+            conn.commit()
+            if not claimed:
+                return
+
+            kind, payload_json = conn.execute(
+                "SELECT kind, payload_json FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+
+        try:
+            result = self._handlers[kind](**json.loads(payload_json))
+        except Exception as e:
+            status, result_json, error = "failed", None, str(e)
+        else:
+            status, result_json, error = "done", json.dumps(result), None
+
+        with self._connection() as conn:
+            conn.execute(
+                """UPDATE jobs SET status = ?, result_json = ?, error = ?, updated_at = CURRENT_TIMESTAMP
+                   WHERE id = ?""",
+                (status, result_json, error, job_id),
+            )
+            conn.commit()
@@ -0,0 +1,232 @@
+"""Request latency metrics, timing spans and an opt-in sampling profiler.
+
+Latencies are kept per process in a ``Registry`` and exposed in the
+Prometheus text format by ``/metrics``. Each series records fixed histogram
+buckets plus a bounded reservoir of recent samples for p50/p95/p99. With
+several gunicorn workers each process reports its own numbers; Prometheus
+should scrape them with the ``instance`` label distinguishing workers.
+
+``PROFILE_EVERY_N`` > 0 runs every Nth request under cProfile and writes the
+stats to ``PROFILE_DIR`` (load them with ``python -m pstats`` or snakeviz).
+"""
+
+import cProfile
+import functools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from itertools import count
+
+from flask import g, request
+
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+RESERVOIR_SIZE = 2048
+
+
+class LatencySeries:
+    def __init__(self):
+        self.bucket_counts = [0] * len(BUCKETS)
+        self.count = 0
+        self.total = 0.0
+        self.recent = deque(maxlen=RESERVOIR_SIZE)
+
+    def observe(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.recent.append(seconds)
+        for index, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[index] += 1
+                break
+
+    def quantiles(self):
+        samples = sorted(self.recent)
+        if not samples:
+            return {q: 0.0 for q in QUANTILES}
+        return {
+            q: samples[min(len(samples) - 1, int(q * len(samples)))] for q in QUANTILES
+        }
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+class Registry:
+    def __init__(self):
+        self._latency = {}  # (family, labels) -> LatencySeries
+        self._counters = {}  # (family, labels) -> int
+        self._help = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def describe(self, family, help_text):
+        self._help[family] = help_text
+
+    def observe(self, family, seconds, **labels):
+        key = (family, tuple(sorted(labels.items())))
+        with self._lock:
+            series = self._latency.get(key)
+            if series is None:
+                series = self._latency[key] = LatencySeries()
+            series.observe(seconds)
+
+    def inc(self, family, amount=1, **labels):
+        key = (family, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def add_collector(self, collector):
+        """``collector()`` returns [(family, type, help, [(labels_dict, value)])]"""
+        self._collectors.append(collector)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            latency = sorted(self._latency.items())
+            counters = sorted(self._counters.items())
+
+        families = {}
+        for (family, labels), series in latency:
+            families.setdefault(family, []).append((labels, series))
+        for family, entries in families.items():
+            help_text = self._help.get(family, family)
+            # Full histogram for alerting/aggregation across workers ...
+            lines.append(f"# HELP {family} {help_text}")
+            lines.append(f"# TYPE {family} histogram")
+            for labels, series in entries:
+                cumulative = 0
+                for bound, bucket in zip(BUCKETS, series.bucket_counts):
+                    cumulative += bucket
+                    lines.append(
+                        f"{family}_bucket{_format_labels(labels, le=bound)} {cumulative}"
+                    )
+                lines.append(
+                    f'{family}_bucket{_format_labels(labels, le="+Inf")} {series.count}'
+                )
+                lines.append(f"{family}_sum{_format_labels(labels)} {series.total}")
+                lines.append(f"{family}_count{_format_labels(labels)} {series.count}")
+            # ... and recent-window quantiles for quick p50/p95/p99 reads
+            summary = family.replace("_duration_", "_latency_")
+            lines.append(f"# HELP {summary} {help_text} (recent quantiles)")
+            lines.append(f"# TYPE {summary} summary")
+            for labels, series in entries:
+                for q, value in series.quantiles().items():
+                    lines.append(
+                        f"{summary}{_format_labels(labels, quantile=q)} {value}"
+                    )
+                lines.append(f"{summary}_sum{_format_labels(labels)} {series.total}")
+                lines.append(f"{summary}_count{_format_labels(labels)} {series.count}")
+
+        counter_families = {}
+        for (family, labels), value in counters:
+            counter_families.setdefault(family, []).append((labels, value))
+        for family, entries in counter_families.items():
+            lines.append(f"# HELP {family} {self._help.get(family, family)}")
+            lines.append(f"# TYPE {family} counter")
+            for labels, value in entries:
+                lines.append(f"{family}{_format_labels(labels)} {value}")
+
+        for collector in self._collectors:
+            for family, kind, help_text, samples in collector():
+                lines.append(f"# HELP {family} {help_text}")
+                lines.append(f"# TYPE {family} {kind}")
+                for labels, value in samples:
+                    lines.append(
+                        f"{family}{_format_labels(sorted(labels.items()))} {value}"
+                    )
+
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+REGISTRY.describe(
+    "skilllens_request_duration_seconds", "HTTP request latency by endpoint"
+)
+REGISTRY.describe(
+    "skilllens_span_duration_seconds", "Time spent in instrumented code paths"
+)
+REGISTRY.describe("skilllens_requests_total", "HTTP requests by endpoint and status")
+
+
+@contextmanager
+def span(name):
+    """Time a block of code as ``skilllens_span_duration_seconds{span=name}``"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        REGISTRY.observe(
+            "skilllens_span_duration_seconds", time.perf_counter() - start, span=name
+        )
+
+
+def timed(name=None):
+    """Decorator form of ``span``; defaults to the function name"""
+
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def observe_statement(sql, seconds):
+    """db.py statement observer: one span per SQL verb (db.select, db.insert, ...)"""
+    verb = sql.lstrip().split(None, 1)[0].lower() if sql.strip() else "empty"
+    REGISTRY.observe("skilllens_span_duration_seconds", seconds, span=f"db.{verb}")
+
+
+def instrument_app(app, profile_every=0, profile_dir="profiles"):
+    """Record per-endpoint latency and, optionally, profile every Nth request"""
+    request_counter = count(1)
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_start = time.perf_counter()
+        if profile_every and next(request_counter) % profile_every == 0:
+            g.profiler = cProfile.Profile()
+            g.profiler.enable()
+
+    @app.after_request
+    def _record_status(response):
+        g.metrics_status = response.status_code
+        return response
+
+    @app.teardown_request
+    def _record_latency(error=None):
+        start = g.pop("metrics_start", None)
+        if start is None:
+            return
+        endpoint = request.endpoint or "unmatched"
+        status = g.pop("metrics_status", 500)
+        REGISTRY.observe(
+            "skilllens_request_duration_seconds",
+            time.perf_counter() - start,
+            endpoint=endpoint,
+            method=request.method,
+        )
+        REGISTRY.inc("skilllens_requests_total", endpoint=endpoint, status=status)
+
+        profiler = g.pop("profiler", None)
+        if profiler is not None:
+            profiler.disable()
+            os.makedirs(profile_dir, exist_ok=True)
+            filename = f"{time.strftime('%Y%m%d_%H%M%S')}_{endpoint}_{os.getpid()}.prof"
+            profiler.dump_stats(os.path.join(profile_dir, filename))
@@ -0,0 +1,345 @@
+"""Versioned schema migrations tracked with ``PRAGMA user_version``.
+
+Each entry in ``MIGRATIONS`` upgrades the schema by one version, either as a
+list of SQL statements or as a callable taking the cursor. ``migrate()`` runs
+the pending ones, each in its own ``BEGIN IMMEDIATE`` transaction, so several
+gunicorn workers starting at once apply every migration exactly once; a worker
+that finds another process migrating waits for it instead of failing.
+
+Deployments run ``python migrations.py`` as a release step before the web
+processes start, so workers normally find the schema current and skip the
+write lock altogether.
+
+Migrations change the schema only. Rewriting existing rows belongs in the
+batched scripts (``compact_storage.py``, ``rebuild_search.py``,
+``user_stats.py``), so no migration holds the write lock for long.
+
+Append new migrations to the end of the list; never edit one that shipped.
+"""
+
+import os
+import sqlite3
+import time
+
+from db import DB_PATH, db_connection, register_functions
+
+# Pause between attempts to take the write lock while another process migrates
+LOCK_RETRY_SECONDS = 0.5
+
+
+def _initial_schema(c):
+    # Users table
+    c.execute("""CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        email TEXT UNIQUE NOT NULL,
+        password TEXT NOT NULL,
+        full_name TEXT NOT NULL,
+        phone TEXT,
+        location TEXT,
+        bio TEXT,
+        linkedin TEXT,
+        github TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""")
+
+    # Resumes table
+    c.execute("""CREATE TABLE IF NOT EXISTS resumes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        filename TEXT NOT NULL,
+        extracted_text TEXT,
+        skills_json TEXT,
+        uploaded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        content_hash TEXT,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )""")
+
+    # Databases created before content hashing need the new column
+    c.execute("PRAGMA table_info(resumes)")
+    if "content_hash" not in [column[1] for column in c.fetchall()]:
+        c.execute("ALTER TABLE resumes ADD COLUMN content_hash TEXT")
+
+    # Content-addressed cache of parsed uploads (one file on disk per hash)
+    c.execute("""CREATE TABLE IF NOT EXISTS resume_blobs (
+        sha256 TEXT PRIMARY KEY,
+        stored_filename TEXT NOT NULL,
+        extracted_text TEXT,
+        skills_json TEXT,
+        ref_count INTEGER NOT NULL DEFAULT 0,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )""")
+
+    # Analysis table
+    c.execute("""CREATE TABLE IF NOT EXISTS analysis (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        user_id INTEGER NOT NULL,
+        resume_id INTEGER NOT NULL,
+        target_role TEXT NOT NULL,
+        skill_gap_json TEXT,
+        roadmap_json TEXT,
+        score INTEGER,
+        analyzed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id),
+        FOREIGN KEY (resume_id) REFERENCES resumes (id)
+    )""")
+
+    # Background jobs table
+    c.execute("""CREATE TABLE IF NOT EXISTS jobs (
+        id TEXT PRIMARY KEY,
+        user_id INTEGER NOT NULL,
+        kind TEXT NOT NULL,
+        status TEXT NOT NULL,
+        payload_json TEXT,
+        result_json TEXT,
+        error TEXT,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (user_id) REFERENCES users (id)
+    )""")
+
+
+def _compressed_columnar_storage(c):
+    c.execute("""CREATE TABLE IF NOT EXISTS resume_skills (
+        resume_id INTEGER NOT NULL,
+        category TEXT NOT NULL,
+        skill TEXT NOT NULL,
+        PRIMARY KEY (resume_id, category, skill),
+        FOREIGN KEY (resume_id) REFERENCES resumes (id)
+    ) WITHOUT ROWID""")
+    c.execute("ALTER TABLE resumes ADD COLUMN career_level TEXT")
+    c.execute("ALTER TABLE resumes ADD COLUMN experience_years INTEGER")
+    # Existing rows are converted outside the migration: the re-extractor
+    # fills their resume_skills rows and scalar columns (their vocabulary
+    # version is unset), and compact_storage.py compresses their text
+
+
+def _user_stats(c):
+    c.execute("""CREATE TABLE IF NOT EXISTS user_stats (
+        user_id INTEGER PRIMARY KEY,
+        resume_count INTEGER NOT NULL DEFAULT 0,
+        analysis_count INTEGER NOT NULL DEFAULT 0,
+        score_sum INTEGER NOT NULL DEFAULT 0,
+        last_activity TIMESTAMP
+    )""")
+    c.execute("""CREATE TABLE IF NOT EXISTS user_role_scores (
+        user_id INTEGER NOT NULL,
+        target_role TEXT NOT NULL,
+        best_score INTEGER NOT NULL,
+        PRIMARY KEY (user_id, target_role)
+    ) WITHOUT ROWID""")
+    # Existing users are backfilled offline by ``user_stats.py --rebuild``
+
+
+MIGRATIONS = [
+    # 1: tables previously created ad hoc by init_db (adopts existing databases)
+    _initial_schema,
+    # 2: indexes for the dashboard, profile stats and account deletion queries
+    [
+        "CREATE INDEX IF NOT EXISTS idx_analysis_user_analyzed ON analysis (user_id, analyzed_at DESC)",
+        "CREATE INDEX IF NOT EXISTS idx_analysis_resume ON analysis (resume_id)",
+        "CREATE INDEX IF NOT EXISTS idx_resumes_user ON resumes (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_user ON jobs (user_id)",
+        "CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status, created_at)",
+        "CREATE INDEX IF NOT EXISTS idx_resume_blobs_ref_count ON resume_blobs (ref_count)",
+    ],
+    # 3: server-side session storage (SESSION_BACKEND=sqlite)
+    [
+        """CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            data_json TEXT NOT NULL,
+            expires_at REAL NOT NULL
+        )""",
+        "CREATE INDEX IF NOT EXISTS idx_sessions_expires ON sessions (expires_at)",
+    ],
+    # 4: per-file progress of bulk ingestion runs (makes ingest.py resumable)
+    [
+        """CREATE TABLE IF NOT EXISTS ingest_log (
+            batch_key TEXT NOT NULL,
+            member TEXT NOT NULL,
+            user_id INTEGER,
+            status TEXT NOT NULL,
+            error TEXT,
+            processed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (batch_key, member)
+        )""",
+    ],
+    # 5: compressed text/JSON columns, skills split into resume_skills rows.
+    # Schema only; older rows are converted as described in the function.
+    _compressed_columnar_storage,
+    # 6: inverted skill -> resume index for /api/search/skills
+    [
+        """CREATE TABLE IF NOT EXISTS skill_index (
+            skill TEXT NOT NULL,
+            resume_id INTEGER NOT NULL,
+            PRIMARY KEY (skill, resume_id)
+        ) WITHOUT ROWID""",
+        """CREATE TABLE IF NOT EXISTS skill_counts (
+            skill TEXT PRIMARY KEY,
+            resumes INTEGER NOT NULL
+        ) WITHOUT ROWID""",
+        # Postings for existing resumes are written by the re-extractor
+    ],
+    # 7: full-text index over resume text, kept in sync by triggers. The text
+    # is compressed, so connections writing resumes need db.register_functions
+    # (plain sqlite3 connections cannot write resumes), and the index keeps its
+    # own uncompressed copy of every document for snippets (see 13). Existing
+    # rows are indexed by rebuild_search.py, not here.
+    [
+        """CREATE VIRTUAL TABLE IF NOT EXISTS resumes_fts
+           USING fts5(body, tokenize = 'porter unicode61')""",
+        """CREATE TRIGGER IF NOT EXISTS resumes_fts_insert AFTER INSERT ON resumes BEGIN
+            INSERT INTO resumes_fts (rowid, body)
+            VALUES (new.id, decompress_text(new.extracted_text));
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS resumes_fts_delete AFTER DELETE ON resumes BEGIN
+            DELETE FROM resumes_fts WHERE rowid = old.id;
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS resumes_fts_update
+           AFTER UPDATE OF extracted_text ON resumes BEGIN
+            DELETE FROM resumes_fts WHERE rowid = old.id;
+            INSERT INTO resumes_fts (rowid, body)
+            VALUES (new.id, decompress_text(new.extracted_text));
+        END""",
+    ],
+    # 8: vocabulary version per extraction and re-extraction progress
+    [
+        "ALTER TABLE resumes ADD COLUMN vocabulary_version TEXT",
+        "ALTER TABLE resume_blobs ADD COLUMN vocabulary_version TEXT",
+        "CREATE INDEX IF NOT EXISTS idx_resumes_vocabulary ON resumes (vocabulary_version)",
+        """CREATE TABLE IF NOT EXISTS reextract_runs (
+            vocabulary_version TEXT PRIMARY KEY,
+            status TEXT NOT NULL,
+            total INTEGER NOT NULL,
+            processed INTEGER NOT NULL DEFAULT 0,
+            last_resume_id INTEGER NOT NULL DEFAULT 0,
+            owner TEXT,
+            lease_expires REAL,
+            started_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )""",
+    ],
+    # 9: per-user data version behind the dashboard/profile ETags (user ids
+    # are AUTOINCREMENT, so (id, version) never repeats across accounts)
+    [
+        "ALTER TABLE users ADD COLUMN data_version INTEGER NOT NULL DEFAULT 0",
+    ],
+    # 10: materialized per-user statistics for /api/profile
+    _user_stats,
+    # 11: covering indexes for keyset-paginated /api/history (with and without
+    # a role filter); the first also serves the dashboard's recent analyses
+    [
+        """CREATE INDEX IF NOT EXISTS idx_analysis_user_history
+           ON analysis (user_id, analyzed_at, id, target_role, score, resume_id)""",
+        """CREATE INDEX IF NOT EXISTS idx_analysis_user_role_history
+           ON analysis (user_id, target_role, analyzed_at, id, score, resume_id)""",
+        "DROP INDEX IF EXISTS idx_analysis_user_analyzed",
+    ],
+    # 12: random id of this database, part of the dashboard/profile ETags so
+    # a recreated database (e.g. on an ephemeral disk) never reuses old ones
+    [
+        """CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        )""",
+        """INSERT OR IGNORE INTO meta (key, value)
+           VALUES ('instance_id', lower(hex(randomblob(8))))""",
+    ],
+    # 13: the full-text index becomes external-content over a view that
+    # decompresses resume text, so it no longer stores its own uncompressed
+    # copy; snippets decompress the matched rows. Removing a row from such an
+    # index needs the text it was indexed with, so the triggers only do that
+    # for rows the index has (rows awaiting the backfill are not), and skip
+    # updates that only change the encoding. Existing rows are re-indexed by
+    # rebuild_search.py, not here.
+    [
+        "DROP TRIGGER IF EXISTS resumes_fts_insert",
+        "DROP TRIGGER IF EXISTS resumes_fts_delete",
+        "DROP TRIGGER IF EXISTS resumes_fts_update",
+        "DROP TABLE IF EXISTS resumes_fts",
+        """CREATE VIEW IF NOT EXISTS resumes_text AS
+           SELECT id, decompress_text(extracted_text) AS body FROM resumes""",
+        """CREATE VIRTUAL TABLE IF NOT EXISTS resumes_fts USING fts5(
+            body,
+            content = 'resumes_text',
+            content_rowid = 'id',
+            tokenize = 'porter unicode61'
+        )""",
+        """CREATE TRIGGER IF NOT EXISTS resumes_fts_insert AFTER INSERT ON resumes BEGIN
+            INSERT INTO resumes_fts (rowid, body)
+            VALUES (new.id, decompress_text(new.extracted_text));
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS resumes_fts_delete AFTER DELETE ON resumes
+           WHEN EXISTS (SELECT 1 FROM resumes_fts_docsize WHERE id = old.id) BEGIN
+            INSERT INTO resumes_fts (resumes_fts, rowid, body)
+            VALUES ('delete', old.id, decompress_text(old.extracted_text));
+        END""",
+        """CREATE TRIGGER IF NOT EXISTS resumes_fts_update
+           AFTER UPDATE OF extracted_text ON resumes
+           WHEN decompress_text(old.extracted_text) IS NOT decompress_text(new.extracted_text)
+           BEGIN
+            INSERT INTO resumes_fts (resumes_fts, rowid, body)
+            SELECT 'delete', old.id, decompress_text(old.extracted_text)
+            WHERE EXISTS (SELECT 1 FROM resumes_fts_docsize WHERE id = old.id);
+            INSERT INTO resumes_fts (rowid, body)
+            VALUES (new.id, decompress_text(new.extracted_text));
+        END""",
+    ],
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def _begin_immediate(conn):
+    """Take the write lock, however long another process holds it"""
+    while True:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            return
+        except sqlite3.OperationalError as e:
+            # The busy timeout ran out while another worker was migrating
+            if "locked" not in str(e):
+                raise
+            time.sleep(LOCK_RETRY_SECONDS)
+
+
+def schema_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def migrate(conn, target=SCHEMA_VERSION):
+    """Apply pending migrations up to ``target``; returns the resulting version"""
+    register_functions(conn)
+    version = schema_version(conn)
+    if version >= target:
+        return version
+    while True:
+        _begin_immediate(conn)
+        try:
+            # Re-read under the write lock: another worker may have migrated
+            version = schema_version(conn)
+            if version >= target:
+                conn.rollback()
+                return version
+
+            migration = MIGRATIONS[version]
+            c = conn.cursor()
+            if callable(migration):
+                migration(c)
+            else:
+                for statement in migration:
+                    c.execute(statement)
+            c.execute(f"PRAGMA user_version = {version + 1}")
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def main():
+    os.makedirs(os.path.dirname(DB_PATH), exist_ok=True)
+    with db_connection() as conn:
+        print(f"{DB_PATH}: schema version {migrate(conn)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""Password hashing on a bounded executor.
+
+Hashing is deliberately slow (hundreds of milliseconds of CPU per call), so
+it runs on a small dedicated thread pool instead of in whatever thread
+serves the request. ``hashlib`` releases the GIL while it works, so the pool
+size is the number of cores hashing may occupy. The calling thread still
+waits for its result: other requests are served meanwhile only by threaded
+workers, which is why gunicorn.conf.py selects ``gthread`` (a sync worker
+is blocked either way). Calls beyond the pool wait in a bounded queue, and
+once that is full ``PasswordHashBusy`` is raised so a login storm is shed
+with a 503 instead of piling up behind the workers.
+
+The method string is Werkzeug's (``pbkdf2:sha256:600000``,
+``scrypt:32768:8:1``, ...). Stored hashes made with other parameters still
+verify; ``needs_rehash`` tells the caller to replace them.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+from metrics import REGISTRY
+
+REGISTRY.describe(
+    "skilllens_password_hash_wait_seconds",
+    "Time password hashing calls spent queued before a worker picked them up",
+)
+REGISTRY.describe(
+    "skilllens_password_hash_rejected_total",
+    "Password hashing calls refused because the queue was full",
+)
+
+
+class PasswordHashBusy(Exception):
+    """The hashing queue is full or the call timed out waiting for a worker"""
+
+
+class PasswordHasher:
+    def __init__(
+        self, method="pbkdf2:sha256:600000", workers=2, max_queue=32, timeout=10
+    ):
+        self.method = method
+        self.workers = workers
+        self.max_queue = max_queue
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="pwhash"
+        )
+        # One slot per running or queued call
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._prefix = None
+
+    def _run(self, kind, func, *args):
+        if not self._slots.acquire(blocking=False):
+            REGISTRY.inc("skilllens_password_hash_rejected_total", kind=kind)
+            raise PasswordHashBusy("Too many password operations in progress")
+
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+
+        def task():
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+            started = time.perf_counter()
+            REGISTRY.observe(
+                "skilllens_password_hash_wait_seconds", started - submitted, kind=kind
+            )
+            try:
+                return func(*args)
+            finally:
+                REGISTRY.observe(
+                    "skilllens_span_duration_seconds",
+                    time.perf_counter() - started,
+                    span=f"password.{kind}",
+                )
+                with self._lock:
+                    self._running -= 1
+                self._slots.release()
+
+        try:
+            future = self._executor.submit(task)
+        except BaseException:
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+        try:
+            return future.result(self.timeout)
+        except FutureTimeoutError:
+            # The call still finishes (and frees its slot) in the background
+            raise PasswordHashBusy("Timed out waiting for password hashing")
+
+    def hash(self, password):
+        return self._run("hash", generate_password_hash, password, self.method)
+
+    def verify(self, stored_hash, password):
+        return self._run("verify", check_password_hash, stored_hash, password)
+
+    def needs_rehash(self, stored_hash):
+        """True if ``stored_hash`` was made with other parameters than ``method``"""
+        if self._prefix is None:
+            # Werkzeug fills in defaults ("pbkdf2" -> "pbkdf2:sha256:600000"),
+            # so compare against the prefix it actually writes
+            sample = self._run("hash", generate_password_hash, "", self.method)
+            self._prefix = sample.split("$", 1)[0]
+        return stored_hash.split("$", 1)[0] != self._prefix
+
+    def stats(self):
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": self._queued,
+                "running": self._running,
+            }
+
+    def collect_metrics(self):
+        """Registry collector exposing the queue depth and busy workers"""
+        stats = self.stats()
+        return [
+            (
+                "skilllens_password_hash_queue_depth",
+                "gauge",
+                "Password hashing calls waiting for a worker",
+                [({}, stats["queued"])],
+            ),
+            (
+                "skilllens_password_hash_running",
+                "gauge",
+                "Password hashing calls currently running",
+                [({}, stats["running"])],
+            ),
+            (
+                "skilllens_password_hash_capacity",
+                "gauge",
+                "Configured hashing workers and queue slots",
+                [
+                    ({"slot": "workers"}, stats["workers"]),
+                    ({"slot": "queue"}, stats["max_queue"]),
+                ],
+            ),
+        ]
@@ -0,0 +1,63 @@
+"""Backfill (or rebuild) the full-text index over resume text.
+
+Triggers keep ``resumes_fts`` in sync for rows written after migration 13;
+this indexes everything else. Resumes missing from the index are added in id
+ranges, each in its own short transaction, so uploads keep going while it
+runs. It is safe to interrupt and run again, and to run on a live database.
+
+``resumes_fts`` reads its text from the ``resumes_text`` view, so ``--full``
+rebuilds the whole index from it in a single transaction (blocking writes
+while it runs) for when the index is suspected to be out of sync.
+
+Usage: python rebuild_search.py [--batch-size 500] [--pause 0.05] [--full] [--optimize]
+"""
+
+import argparse
+
+from batches import add_batch_arguments, prepare_database, run_batches
+from db import db_connection
+
+
+def index_missing(c, low, high):
+    # The docsize shadow table lists the indexed rows; rows inserted
+    # meanwhile were already indexed by the trigger
+    return c.execute(
+        """INSERT INTO resumes_fts (rowid, body)
+           SELECT id, body FROM resumes_text
+           WHERE id BETWEEN :low AND :high AND id NOT IN (
+               SELECT id FROM resumes_fts_docsize WHERE id BETWEEN :low AND :high
+           )""",
+        {"low": low, "high": high},
+    ).rowcount
+
+
+def rebuild(batch_size, pause, optimize=False, full=False):
+    if full:
+        with db_connection() as conn:
+            conn.execute("INSERT INTO resumes_fts (resumes_fts) VALUES ('rebuild')")
+            conn.commit()
+        print("rebuilt")
+    else:
+        run_batches("resumes", batch_size, pause, index_missing, "indexed")
+
+    if optimize:
+        # Merges index segments in one transaction; run off-peak
+        with db_connection() as conn:
+            conn.execute("INSERT INTO resumes_fts (resumes_fts) VALUES ('optimize')")
+            conn.commit()
+        print("optimized")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_batch_arguments(parser)
+    parser.add_argument("--full", action="store_true")
+    parser.add_argument("--optimize", action="store_true")
+    args = parser.parse_args()
+
+    prepare_database()
+    rebuild(args.batch_size, args.pause, args.optimize, args.full)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Background re-extraction of skills when the skill vocabulary changes.
+
+Every resume row records the vocabulary version its skills were extracted
+with. When the app starts with a new version, a ``Reextractor`` walks the
+stale rows in id order, re-runs extraction on the stored text (never the
+PDF) and writes each batch in one short transaction.
+
+Progress lives in ``reextract_runs`` (one row per vocabulary version), so a
+restarted process resumes from the last committed id. Only one process works
+on a run at a time: it holds a lease that it renews with every batch, and
+another worker takes over if the lease expires. Work is throttled to a duty
+cycle, sleeping between batches in proportion to the time each batch took.
+"""
+
+import os
+import socket
+import threading
+import time
+import uuid
+
+LEASE_SECONDS = 60
+# How often a process that does not hold the lease checks on the run
+IDLE_POLL_SECONDS = 30
+STALE = "(vocabulary_version IS NULL OR vocabulary_version != ?)"
+
+
+class Reextractor:
+    def __init__(
+        self, connection, version, extract, store, batch_size=200, duty_cycle=0.2
+    ):
+        # ``extract(rows)`` runs outside any transaction on (id, text, hash)
+        # rows; ``store(cursor, results)`` writes its output for one batch
+        self._connection = connection
+        self.version = version
+        self._extract = extract
+        self._store = store
+        self.batch_size = batch_size
+        self.duty_cycle = duty_cycle
+        self.owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self._thread = None
+        self._stop = threading.Event()
+
+    def start(self):
+        """Create the run for this version if needed and work it in a thread"""
+        if self.status()["status"] == "pending":
+            with self._connection() as conn:
+                total = conn.execute(
+                    f"SELECT COUNT(*) FROM resumes WHERE {STALE}", (self.version,)
+                ).fetchone()[0]
+                conn.execute(
+                    """INSERT OR IGNORE INTO reextract_runs (vocabulary_version, status, total)
+                       VALUES (?, ?, ?)""",
+                    (self.version, "running" if total else "done", total),
+                )
+                conn.commit()
+
+        if self._thread is None and self.status()["status"] == "running":
+            self._thread = threading.Thread(
+                target=self._loop, name="reextract", daemon=True
+            )
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        with self._connection() as conn:
+            row = conn.execute(
+                """SELECT status, total, processed, last_resume_id, owner, started_at, updated_at
+                   FROM reextract_runs WHERE vocabulary_version = ?""",
+                (self.version,),
+            ).fetchone()
+        if not row:
+            return {"version": self.version, "status": "pending"}
+        return {
+            "version": self.version,
+            "status": row[0],
+            "total": row[1],
+            "processed": row[2],
+            "last_resume_id": row[3],
+            "owner": row[4],
+            "started_at": row[5],
+            "updated_at": row[6],
+        }
+
+    def _claim(self, conn):
+        """Take or renew the lease; returns the cursor, or None if not ours"""
+        now = time.time()
+        claimed = conn.execute(
+            """UPDATE reextract_runs SET owner = ?, lease_expires = ?
+               WHERE vocabulary_version = ? AND status = 'running'
+                 AND (owner IS NULL OR owner = ? OR lease_expires < ?)""",
+            (self.owner, now + LEASE_SECONDS, self.version, self.owner, now),
+        ).rowcount
+        if not claimed:
+            return None
+        return conn.execute(
+            "SELECT last_resume_id FROM reextract_runs WHERE vocabulary_version = ?",
+            (self.version,),
+        ).fetchone()[0]
+
+    def _loop(self):
+        while not self._stop.is_set():
+            started = time.perf_counter()
+            try:
+                more = self.run_batch()
+            except Exception:
+                # Transient errors (e.g. a locked database): back off, retry
+                more = None
+            if more is False:
+                return
+            if more is None:
+                self._stop.wait(IDLE_POLL_SECONDS)
+                continue
+            elapsed = time.perf_counter() - started
+            self._stop.wait(elapsed * (1 - self.duty_cycle) / self.duty_cycle)
+
+    def run_batch(self):
+        """Re-extract the next batch of stale resumes
+
+        Returns True if work remains, False once the run is done and None
+        while another process holds the lease.
+        """
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            last_id = self._claim(conn)
+            conn.commit()
+            if last_id is None:
+                status = conn.execute(
+                    "SELECT status FROM reextract_runs WHERE vocabulary_version = ?",
+                    (self.version,),
+                ).fetchone()
+                return False if status and status[0] == "done" else None
+
+            rows = conn.execute(
+                f"""SELECT id, extracted_text, content_hash FROM resumes
+                    WHERE id > ? AND {STALE}
+                    ORDER BY id LIMIT ?""",
+                (last_id, self.version, self.batch_size),
+            ).fetchall()
+
+        if not rows:
+            with self._connection() as conn:
+                conn.execute(
+                    """UPDATE reextract_runs
+                       SET status = 'done', owner = NULL, updated_at = CURRENT_TIMESTAMP
+                       WHERE vocabulary_version = ? AND owner = ?""",
+                    (self.version, self.owner),
+                )
+                conn.commit()
+            return False
+
+        # The expensive part runs without holding the write lock
+        results = self._extract(rows)
+
+        with self._connection() as conn:
+            c = conn.cursor()
+            c.execute("BEGIN IMMEDIATE")
+            if self._claim(c) is None:
+                conn.rollback()
+                return None
+            self._store(c, results)
+            c.execute(
+                """UPDATE reextract_runs
+                   SET processed = processed + ?, last_resume_id = ?, updated_at = CURRENT_TIMESTAMP
+                   WHERE vocabulary_version = ?""",
+                (len(rows), rows[-1][0], self.version),
+            )
+            conn.commit()
+        return True
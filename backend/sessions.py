@@ -0,0 +1,289 @@
+"""Session backends that work across gunicorn workers and nodes.
+
+Every worker must sign cookies with the same key, so the key comes from the
+environment (``SECRET_KEY``) or a key file shared by the node, never from a
+per-process random value. Older keys stay valid for verification, which lets
+a deployment rotate keys without logging everyone out.
+
+``SESSION_BACKEND`` selects where session data lives:
+
+* ``cookie`` - signed cookie (Flask's default format), rotating keys
+* ``sqlite`` - server-side rows in the ``sessions`` table, cookie holds an id
+* ``memory`` - server-side dict for local development and tests
+"""
+
+import os
+import random
+import secrets
+import threading
+import time
+
+from flask import request
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SecureCookieSessionInterface, SessionInterface, SessionMixin
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from werkzeug.datastructures import CallbackDict
+
+# Fraction of saves that also purge expired rows from the SQLite store
+PURGE_PROBABILITY = 0.01
+
+# request.environ flag for responses that must not carry the session
+SKIP_SESSION = "skilllens.skip_session"
+
+
+def skip_session():
+    """Leave the session out of this request's response
+
+    No Set-Cookie and no ``Vary: Cookie``, for responses that shared caches may
+    store for everyone, such as fingerprinted assets.
+    """
+    request.environ[SKIP_SESSION] = True
+
+
+def session_skipped():
+    return request.environ.get(SKIP_SESSION, False)
+
+
+def load_secret_keys(key_file):
+    """Return signing keys, newest first.
+
+    ``SECRET_KEY`` / ``SECRET_KEY_FALLBACKS`` (comma separated) win when set.
+    Otherwise ``key_file`` holds one key per line, newest first; it is created
+    with a fresh key if missing. To rotate, prepend a new line and keep the
+    old ones until existing sessions have expired.
+    """
+    if os.environ.get("SECRET_KEY"):
+        fallbacks = os.environ.get("SECRET_KEY_FALLBACKS", "")
+        return [os.environ["SECRET_KEY"]] + [
+            key.strip() for key in fallbacks.split(",") if key.strip()
+        ]
+
+    os.makedirs(os.path.dirname(key_file), exist_ok=True)
+    try:
+        # O_EXCL: when several workers boot at once exactly one writes the key
+        fd = os.open(key_file, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    except FileExistsError:
+        pass
+    else:
+        with os.fdopen(fd, "w") as file:
+            file.write(secrets.token_hex(32) + "\n")
+
+    keys = []
+    for _ in range(50):
+        with open(key_file) as file:
+            keys = [line.strip() for line in file if line.strip()]
+        if keys:
+            break
+        time.sleep(0.01)  # the creating worker has not written it yet
+    if not keys:
+        raise RuntimeError(f"Secret key file {key_file} is empty")
+    return keys
+
+
+def _signing_serializer(keys, salt, serializer=None):
+    # itsdangerous signs with the last key and accepts all of them
+    return URLSafeTimedSerializer(
+        list(reversed(keys)),
+        salt=salt,
+        serializer=serializer,
+        signer_kwargs={"key_derivation": "hmac"},
+    )
+
+
+class RotatingCookieSessionInterface(SecureCookieSessionInterface):
+    """Flask's signed cookie sessions, verified against every configured key"""
+
+    def __init__(self, keys):
+        self.keys = keys
+
+    def get_signing_serializer(self, app):
+        return URLSafeTimedSerializer(
+            list(reversed(self.keys)),
+            salt=self.salt,
+            serializer=self.serializer,
+            signer_kwargs={
+                "key_derivation": self.key_derivation,
+                "digest_method": self.digest_method,
+            },
+        )
+
+    def save_session(self, app, session, response):
+        if not session_skipped():
+            super().save_session(app, session, response)
+
+
+class ServerSideSession(CallbackDict, SessionMixin):
+    def __init__(self, initial=None, sid=None, new=False, expires_at=None):
+        def on_update(self):
+            self.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.expires_at = expires_at
+        self.modified = False
+        # Whose session the stored record was; a different user gets a new id
+        self.loaded_user_id = self.get("user_id")
+
+
+class MemorySessionStore:
+    """Process-local stand-in for the SQLite store"""
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def load(self, sid):
+        with self._lock:
+            entry = self._data.get(sid)
+            if entry and entry[1] < time.time():
+                del self._data[sid]
+                return None
+            return entry
+
+    def save(self, sid, data, expires_at):
+        with self._lock:
+            self._data[sid] = (data, expires_at)
+
+    def delete(self, sid):
+        with self._lock:
+            self._data.pop(sid, None)
+
+
+class SqliteSessionStore:
+    """Session rows in the ``sessions`` table, shared by every worker"""
+
+    serializer = TaggedJSONSerializer()
+
+    def __init__(self, connection):
+        self._connection = connection
+
+    def load(self, sid):
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT data_json, expires_at FROM sessions WHERE id = ? AND expires_at > ?",
+                (sid, time.time()),
+            ).fetchone()
+        if not row:
+            return None
+        return self.serializer.loads(row[0]), row[1]
+
+    def save(self, sid, data, expires_at):
+        with self._connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO sessions (id, data_json, expires_at) VALUES (?, ?, ?)",
+                (sid, self.serializer.dumps(data), expires_at),
+            )
+            if random.random() < PURGE_PROBABILITY:
+                conn.execute(
+                    "DELETE FROM sessions WHERE expires_at <= ?", (time.time(),)
+                )
+            conn.commit()
+
+    def delete(self, sid):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM sessions WHERE id = ?", (sid,))
+            conn.commit()
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Keeps session data in a store; the cookie carries only a signed id"""
+
+    salt = "server-session"
+    session_class = ServerSideSession
+
+    def __init__(self, store, keys):
+        self.store = store
+        self.keys = keys
+
+    def open_session(self, app, request):
+        cookie = request.cookies.get(self.get_cookie_name(app))
+        if cookie:
+            try:
+                sid = _signing_serializer(self.keys, self.salt).loads(cookie)
+            except BadSignature:
+                sid = None
+            entry = self.store.load(sid) if sid else None
+            if entry:
+                return self.session_class(entry[0], sid=sid, expires_at=entry[1])
+        return self.session_class(sid=secrets.token_urlsafe(32), new=True)
+
+    def save_session(self, app, session, response):
+        if session_skipped():
+            return
+
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+
+        if session.accessed:
+            response.vary.add("Cookie")
+
+        if not session:
+            if session.modified:
+                if not session.new:
+                    self.store.delete(session.sid)
+                response.delete_cookie(
+                    name,
+                    domain=domain,
+                    path=path,
+                    secure=secure,
+                    samesite=samesite,
+                    httponly=httponly,
+                )
+                response.vary.add("Cookie")
+            return
+
+        if not self.should_set_cookie(app, session):
+            return
+
+        # Logging in (or switching users) moves the data to a fresh id, so an
+        # id planted in the browser beforehand never becomes authenticated
+        if not session.new and session.get("user_id") != session.loaded_user_id:
+            self.store.delete(session.sid)
+            session.sid = secrets.token_urlsafe(32)
+            session.expires_at = None
+
+        # Only write the store when data changed or half the lifetime has passed
+        lifetime = app.permanent_session_lifetime.total_seconds()
+        now = time.time()
+        if (
+            session.modified
+            or session.expires_at is None
+            or session.expires_at - now < lifetime / 2
+        ):
+            self.store.save(session.sid, dict(session), now + lifetime)
+
+        response.set_cookie(
+            name,
+            _signing_serializer(self.keys, self.salt).dumps(session.sid),
+            expires=self.get_expiration_time(app, session),
+            httponly=httponly,
+            domain=domain,
+            path=path,
+            secure=secure,
+            samesite=samesite,
+        )
+        response.vary.add("Cookie")
+
+
+def configure_sessions(app, connection, key_file):
+    """Install the signing keys and the backend named by SESSION_BACKEND"""
+    keys = load_secret_keys(key_file)
+    app.secret_key = keys[0]
+
+    backend = os.environ.get("SESSION_BACKEND", "cookie")
+    if backend == "cookie":
+        app.session_interface = RotatingCookieSessionInterface(keys)
+    elif backend == "sqlite":
+        app.session_interface = ServerSideSessionInterface(
+            SqliteSessionStore(connection), keys
+        )
+    elif backend == "memory":
+        app.session_interface = ServerSideSessionInterface(MemorySessionStore(), keys)
+    else:
+        raise ValueError(f"Unknown SESSION_BACKEND: {backend}")
+    app.config["SESSION_BACKEND"] = backend
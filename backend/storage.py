@@ -0,0 +1,236 @@
+"""Blob storage for uploaded resumes.
+
+Uploads are addressed by key (``<sha256>.pdf``). Two backends share one
+interface:
+
+* ``LocalStorage`` shards files into hash-prefix subdirectories
+  (``uploads/ab/cd/abcd....pdf``) so no single directory grows unbounded.
+  Files from the older flat layout are still found and deleted.
+* ``S3Storage`` talks to any S3-compatible service through a boto3-style
+  client. ``MemoryS3Client`` is an in-process stand-in for tests and local
+  development (``STORAGE_BACKEND=memory``).
+
+Writes go through ``writer()``, which accepts chunks as they arrive and only
+publishes the blob under its key on ``commit`` - the key usually depends on
+a hash computed over the same stream. ``open`` returns a seekable binary file
+that can be handed straight to the PDF parser.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+from uuid import uuid4
+
+COPY_CHUNK_SIZE = 64 * 1024
+# Uploads larger than this spool to disk while waiting for S3
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+
+class LocalWriter:
+    def __init__(self, storage):
+        self.storage = storage
+        os.makedirs(storage.root, exist_ok=True)
+        self.tmp_path = os.path.join(storage.root, f".upload-{uuid4().hex}.tmp")
+        self.file = open(self.tmp_path, "wb")
+
+    def write(self, chunk):
+        self.file.write(chunk)
+
+    def commit(self, key):
+        self.file.close()
+        path = self.storage.path(key)
+        if os.path.exists(path):
+            os.remove(self.tmp_path)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(self.tmp_path, path)
+
+    def abort(self):
+        self.file.close()
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+class LocalStorage:
+    """Content-addressed files under root/<k[0:2]>/<k[2:4]>/<key>"""
+
+    def __init__(self, root, shard_depth=2, shard_width=2):
+        self.root = root
+        self.shard_depth = shard_depth
+        self.shard_width = shard_width
+
+    def path(self, key):
+        shards = [
+            key[i * self.shard_width : (i + 1) * self.shard_width]
+            for i in range(self.shard_depth)
+        ]
+        return os.path.join(self.root, *shards, key)
+
+    def _existing_path(self, key):
+        # Fall back to the flat layout used before sharding
+        for path in (self.path(key), os.path.join(self.root, key)):
+            if os.path.exists(path):
+                return path
+        return None
+
+    def writer(self):
+        return LocalWriter(self)
+
+    def put(self, key, stream):
+        writer = self.writer()
+        try:
+            shutil.copyfileobj(stream, writer.file, COPY_CHUNK_SIZE)
+        except BaseException:
+            writer.abort()
+            raise
+        writer.commit(key)
+
+    def open(self, key):
+        path = self._existing_path(key)
+        if path is None:
+            raise FileNotFoundError(key)
+        return open(path, "rb")
+
+    def exists(self, key):
+        return self._existing_path(key) is not None
+
+    def delete(self, key):
+        path = self._existing_path(key)
+        if path is None:
+            return False
+        os.remove(path)
+        return True
+
+
+class S3Writer:
+    def __init__(self, storage):
+        self.storage = storage
+        self.file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+
+    def write(self, chunk):
+        self.file.write(chunk)
+
+    def commit(self, key):
+        try:
+            if not self.storage.exists(key):
+                self.file.seek(0)
+                self.storage.put(key, self.file)
+        finally:
+            self.file.close()
+
+    def abort(self):
+        self.file.close()
+
+
+class S3Storage:
+    """Blobs in an S3-compatible bucket (AWS, MinIO, R2, ...)"""
+
+    def __init__(self, bucket, client=None, prefix="", endpoint_url=None):
+        if client is None:
+            try:
+                import boto3
+            except ImportError:
+                raise RuntimeError(
+                    "STORAGE_BACKEND=s3 requires boto3 (pip install boto3)"
+                )
+            client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+
+    def _key(self, key):
+        return f"{self.prefix}{key}"
+
+    def writer(self):
+        return S3Writer(self)
+
+    def put(self, key, stream):
+        # upload_fileobj streams (multipart for large bodies)
+        self.client.upload_fileobj(stream, self.bucket, self._key(key))
+
+    def open(self, key):
+        try:
+            body = self.client.get_object(Bucket=self.bucket, Key=self._key(key))[
+                "Body"
+            ]
+        except Exception as e:
+            if _is_not_found(e):
+                raise FileNotFoundError(key)
+            raise
+        # Response bodies are not seekable; PyPDF2 needs to seek
+        file = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+        for chunk in iter(lambda: body.read(COPY_CHUNK_SIZE), b""):
+            file.write(chunk)
+        body.close()
+        file.seek(0)
+        return file
+
+    def exists(self, key):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=self._key(key))
+            return True
+        except Exception as e:
+            if _is_not_found(e):
+                return False
+            raise
+
+    def delete(self, key):
+        if not self.exists(key):
+            return False
+        self.client.delete_object(Bucket=self.bucket, Key=self._key(key))
+        return True
+
+
+def _is_not_found(error):
+    response = getattr(error, "response", None) or {}
+    return response.get("Error", {}).get("Code") in ("404", "NoSuchKey", "NotFound")
+
+
+class NotFoundError(Exception):
+    """Shaped like botocore's ClientError for a missing key"""
+
+    def __init__(self, key):
+        super().__init__(f"Not found: {key}")
+        self.response = {"Error": {"Code": "404"}}
+
+
+class MemoryS3Client:
+    """Minimal in-process stand-in for a boto3 S3 client"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, fileobj, bucket, key):
+        self.objects[(bucket, key)] = fileobj.read()
+
+    def get_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise NotFoundError(Key)
+        return {"Body": io.BytesIO(self.objects[(Bucket, Key)])}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise NotFoundError(Key)
+        return {"ContentLength": len(self.objects[(Bucket, Key)])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+def storage_from_config(config, root):
+    """Build the backend selected by STORAGE_BACKEND (local | s3 | memory)"""
+    backend = config["STORAGE_BACKEND"]
+    if backend == "local":
+        return LocalStorage(root, shard_depth=config["STORAGE_SHARD_DEPTH"])
+    if backend == "s3":
+        return S3Storage(
+            config["S3_BUCKET"],
+            prefix=config["S3_PREFIX"],
+            endpoint_url=config["S3_ENDPOINT_URL"],
+        )
+    if backend == "memory":
+        return S3Storage("skilllens", client=MemoryS3Client())
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
@@ -0,0 +1,206 @@
+"""Per-user statistics kept in ``user_stats`` and ``user_role_scores``.
+
+``/api/profile`` reads these instead of counting a user's resumes and
+averaging their analyses on every request. Registration creates a user's
+row; the write paths fold their changes in with ``record_resumes``/
+``record_analyses`` (and drop them with ``forget_user``) inside the same
+transaction as the rows they describe.
+
+Migration 10 only creates the tables. Users who existed before it have no row
+until ``--rebuild`` reaches them, and the write paths leave such users alone;
+their profile is computed from the source tables in the meantime
+(``live_stats``). This script rebuilds the tables in user id ranges, each in
+its own short transaction, or checks them against the source tables and
+repairs the users that drifted. Both are safe to run on a live database.
+
+Usage: python user_stats.py [--check] [--repair] [--rebuild] [--batch-size 500]
+"""
+
+import argparse
+import time
+
+from batches import add_batch_arguments, id_ranges, prepare_database, run_batches
+from db import db_connection
+
+# The statistics as the source tables define them, for users :low..:high
+EXPECTED_STATS = """
+    SELECT u.id AS user_id,
+           (SELECT COUNT(*) FROM resumes r WHERE r.user_id = u.id) AS resume_count,
+           (SELECT COUNT(*) FROM analysis a WHERE a.user_id = u.id) AS analysis_count,
+           (SELECT COALESCE(SUM(a.score), 0) FROM analysis a WHERE a.user_id = u.id)
+               AS score_sum
+    FROM users u WHERE u.id BETWEEN :low AND :high"""
+# Users without activity may have no user_stats row; that reads as zeros
+STORED_STATS = """
+    SELECT u.id, COALESCE(s.resume_count, 0), COALESCE(s.analysis_count, 0),
+           COALESCE(s.score_sum, 0)
+    FROM users u LEFT JOIN user_stats s ON s.user_id = u.id
+    WHERE u.id BETWEEN :low AND :high"""
+EXPECTED_ROLE_SCORES = """
+    SELECT user_id, target_role, MAX(score) AS best_score FROM analysis
+    WHERE user_id BETWEEN :low AND :high AND score IS NOT NULL
+    GROUP BY user_id, target_role"""
+LAST_ACTIVITY = """
+    SELECT MAX(at) FROM (
+        SELECT MAX(uploaded_at) AS at FROM resumes WHERE user_id = user_stats.user_id
+        UNION ALL
+        SELECT MAX(analyzed_at) FROM analysis WHERE user_id = user_stats.user_id
+    )"""
+
+
+def add_user(c, user_id):
+    c.execute("INSERT INTO user_stats (user_id) VALUES (?)", (user_id,))
+
+
+def record_resumes(c, user_id, count=1):
+    c.execute(
+        """UPDATE user_stats SET resume_count = resume_count + ?,
+               last_activity = CURRENT_TIMESTAMP
+           WHERE user_id = ?""",
+        (count, user_id),
+    )
+
+
+def record_analyses(c, user_id, scores):
+    """Fold new analyses, given as (target_role, score) pairs, into the stats"""
+    if not scores:
+        return
+    updated = c.execute(
+        """UPDATE user_stats SET analysis_count = analysis_count + ?,
+               score_sum = score_sum + ?, last_activity = CURRENT_TIMESTAMP
+           WHERE user_id = ?""",
+        (len(scores), sum(score for _, score in scores), user_id),
+    ).rowcount
+    if not updated:
+        # Not backfilled yet; --rebuild counts these analyses with the rest
+        return
+    c.executemany(
+        """INSERT INTO user_role_scores (user_id, target_role, best_score)
+           VALUES (?, ?, ?)
+           ON CONFLICT (user_id, target_role) DO UPDATE SET
+               best_score = MAX(best_score, excluded.best_score)""",
+        [(user_id, role, score) for role, score in scores],
+    )
+
+
+def forget_user(c, user_id):
+    c.execute("DELETE FROM user_stats WHERE user_id = ?", (user_id,))
+    c.execute("DELETE FROM user_role_scores WHERE user_id = ?", (user_id,))
+
+
+def live_stats(c, user_id):
+    """(resume_count, analysis_count, score_sum, last_activity, best_scores)
+    from the source tables, for a user without a user_stats row"""
+    bounds = {"low": user_id, "high": user_id}
+    _, resume_count, analysis_count, score_sum = c.execute(
+        EXPECTED_STATS, bounds
+    ).fetchone()
+    # LAST_ACTIVITY is correlated on user_stats.user_id; alias a one-row table
+    last_activity = c.execute(
+        f"SELECT ({LAST_ACTIVITY}) FROM (SELECT :low AS user_id) AS user_stats",
+        bounds,
+    ).fetchone()[0]
+    best_scores = {
+        role: score for _, role, score in c.execute(EXPECTED_ROLE_SCORES, bounds)
+    }
+    return resume_count, analysis_count, score_sum, last_activity, best_scores
+
+
+def recompute(c, low, high):
+    """Replace the stats of users low..high with values from the source tables"""
+    bounds = {"low": low, "high": high}
+    c.execute("DELETE FROM user_stats WHERE user_id BETWEEN :low AND :high", bounds)
+    c.execute(
+        "DELETE FROM user_role_scores WHERE user_id BETWEEN :low AND :high", bounds
+    )
+    recomputed = c.execute(
+        f"""INSERT INTO user_stats (user_id, resume_count, analysis_count, score_sum)
+            {EXPECTED_STATS}""",
+        bounds,
+    ).rowcount
+    c.execute(
+        f"""UPDATE user_stats SET last_activity = ({LAST_ACTIVITY})
+            WHERE user_id BETWEEN :low AND :high""",
+        bounds,
+    )
+    c.execute(
+        f"""INSERT INTO user_role_scores (user_id, target_role, best_score)
+            {EXPECTED_ROLE_SCORES}""",
+        bounds,
+    )
+    return recomputed
+
+
+def find_drift(c, low, high):
+    """User ids in low..high whose stored stats differ from the source tables"""
+    bounds = {"low": low, "high": high}
+    # One statement, so both sides come from the same snapshot
+    rows = c.execute(
+        f"""SELECT user_id FROM ({EXPECTED_STATS} EXCEPT {STORED_STATS})
+            UNION
+            SELECT user_id FROM user_stats
+            WHERE user_id BETWEEN :low AND :high
+              AND user_id NOT IN (SELECT id FROM users)
+            UNION
+            SELECT user_id FROM (
+                {EXPECTED_ROLE_SCORES}
+                EXCEPT
+                SELECT user_id, target_role, best_score FROM user_role_scores
+                WHERE user_id BETWEEN :low AND :high
+            )
+            UNION
+            SELECT user_id FROM (
+                SELECT user_id, target_role, best_score FROM user_role_scores
+                WHERE user_id BETWEEN :low AND :high
+                EXCEPT
+                {EXPECTED_ROLE_SCORES}
+            )""",
+        bounds,
+    ).fetchall()
+    return sorted(row[0] for row in rows)
+
+
+def rebuild(batch_size, pause):
+    run_batches("users", batch_size, pause, recompute, "recomputed")
+
+
+def check(batch_size, pause, repair=False):
+    """Report users whose stats drifted; with ``repair``, recompute them"""
+    drifted = []
+    for low, high in id_ranges("users", batch_size):
+        with db_connection() as conn:
+            user_ids = find_drift(conn.cursor(), low, high)
+            if user_ids and repair:
+                conn.execute("BEGIN IMMEDIATE")
+                for user_id in user_ids:
+                    recompute(conn.cursor(), user_id, user_id)
+                conn.commit()
+        drifted += user_ids
+        time.sleep(pause)
+
+    action = "repaired" if repair else "found"
+    print(f"{action} {len(drifted)} users with drifted stats")
+    if drifted and not repair:
+        print("user ids:", ", ".join(map(str, drifted[:50])))
+    return drifted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--check", action="store_true")
+    parser.add_argument("--repair", action="store_true", help="fix drifted users")
+    parser.add_argument("--rebuild", action="store_true", help="recompute everyone")
+    add_batch_arguments(parser)
+    args = parser.parse_args()
+
+    prepare_database()
+    if args.rebuild:
+        rebuild(args.batch_size, args.pause)
+    if args.check or args.repair or not args.rebuild:
+        drifted = check(args.batch_size, args.pause, repair=args.repair)
+        if drifted and not args.repair:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
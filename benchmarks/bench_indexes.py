@@ -0,0 +1,134 @@
+"""Time the dashboard, profile and delete-account queries before/after indexes.
+
+Seeds a throwaway database at schema version 1 (no secondary indexes), times
+each endpoint's queries for a sample of users, applies the remaining
+migrations and times them again, printing the query plans.
+
+Usage: python benchmarks/bench_indexes.py [--analyses 1000000] [--users 20000]
+"""
+
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+from migrations import migrate  # noqa: E402
+
+QUERIES = {
+    "dashboard": [
+        """SELECT a.id, a.target_role, a.score, a.analyzed_at, r.filename
+           FROM analysis a
+           JOIN resumes r ON a.resume_id = r.id
+           WHERE a.user_id = ?
+           ORDER BY a.analyzed_at DESC
+           LIMIT 10""",
+    ],
+    "profile": [
+        "SELECT COUNT(*) FROM resumes WHERE user_id = ?",
+        "SELECT COUNT(*), AVG(score) FROM analysis WHERE user_id = ?",
+    ],
+    "delete_account": [
+        "DELETE FROM analysis WHERE user_id = ?",
+        "DELETE FROM jobs WHERE user_id = ?",
+        "DELETE FROM resumes WHERE user_id = ?",
+    ],
+}
+
+ROLES = ["Data Analyst", "Data Scientist", "Backend Developer", "DevOps Engineer"]
+
+
+def seed(conn, users, resumes, analyses, rng):
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    conn.executemany(
+        "INSERT INTO users (id, email, password, full_name) VALUES (?, ?, 'x', 'User')",
+        ((i, f"user{i}@example.com") for i in range(1, users + 1)),
+    )
+    conn.executemany(
+        "INSERT INTO resumes (id, user_id, filename, skills_json) VALUES (?, ?, ?, '{}')",
+        ((i, rng.randint(1, users), f"resume{i}.pdf") for i in range(1, resumes + 1)),
+    )
+    resume_owner = dict(conn.execute("SELECT id, user_id FROM resumes"))
+    rows = []
+    for _ in range(analyses):
+        resume_id = rng.randint(1, resumes)
+        day = rng.randint(0, 700)
+        rows.append(
+            (
+                resume_owner[resume_id],
+                resume_id,
+                rng.choice(ROLES),
+                rng.randint(0, 100),
+                f"2025-{1 + day // 60 % 12:02d}-{1 + day % 28:02d} {day % 24:02d}:00:{day % 60:02d}",
+            )
+        )
+    conn.executemany(
+        "INSERT INTO analysis (user_id, resume_id, target_role, score, analyzed_at) VALUES (?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+
+
+def time_endpoints(conn, user_ids):
+    results = {}
+    for endpoint, statements in QUERIES.items():
+        start = time.perf_counter()
+        for user_id in user_ids:
+            for statement in statements:
+                conn.execute(statement, (user_id,)).fetchall()
+            conn.rollback()
+        results[endpoint] = (time.perf_counter() - start) / len(user_ids)
+    return results
+
+
+def print_plans(conn):
+    for endpoint, statements in QUERIES.items():
+        for statement in statements:
+            plan = conn.execute("EXPLAIN QUERY PLAN " + statement, (1,)).fetchall()
+            details = "; ".join(row[-1] for row in plan)
+            print(f"    {endpoint:15s} {details}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--analyses", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--samples", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = sqlite3.connect(os.path.join(tmp, "bench.db"))
+        migrate(conn, target=1)
+
+        start = time.perf_counter()
+        seed(conn, args.users, args.users * 3, args.analyses, rng)
+        print(f"seeded {args.analyses} analyses in {time.perf_counter() - start:.1f}s")
+
+        user_ids = [rng.randint(1, args.users) for _ in range(args.samples)]
+        before = time_endpoints(conn, user_ids)
+        print("schema v1 (no indexes):")
+        print_plans(conn)
+
+        migrate(conn)
+        conn.execute("ANALYZE")
+        after = time_endpoints(conn, user_ids)
+        print("latest schema:")
+        print_plans(conn)
+
+        print(f"\n{'endpoint':15s} {'before':>12s} {'after':>12s} {'speedup':>9s}")
+        for endpoint in QUERIES:
+            print(
+                f"{endpoint:15s} {before[endpoint] * 1000:9.3f} ms {after[endpoint] * 1000:9.3f} ms"
+                f" {before[endpoint] / after[endpoint]:8.1f}x"
+            )
+        conn.close()
+
+
+if __name__ == "__main__":
+    main()
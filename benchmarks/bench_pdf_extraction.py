@@ -0,0 +1,73 @@
+"""Compare the legacy PDF loop with the streaming / page-parallel extractor.
+
+Usage: python benchmarks/bench_pdf_extraction.py [--pages 10 100 300] [--workers 4]
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+import PyPDF2
+from resume_corpus import make_resume_pdf
+
+from app import app, extract_text_from_pdf
+
+
+def legacy_extract(file_path):
+    """The original implementation: unbounded += over every page"""
+    text = ""
+    with open(file_path, "rb") as file:
+        pdf_reader = PyPDF2.PdfReader(file)
+        for page in pdf_reader.pages:
+            text += page.extract_text()
+    return text
+
+
+def timed(func, *args, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, nargs="+", default=[10, 100, 300])
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for page_count in args.pages:
+            path = os.path.join(tmp, f"resume_{page_count}.pdf")
+            with open(path, "wb") as handle:
+                handle.write(make_resume_pdf(page_count))
+
+            legacy, expected = timed(legacy_extract, path)
+
+            app.config["PDF_PARALLEL_WORKERS"] = 0
+            serial, text = timed(extract_text_from_pdf, path, 0, 0)
+            assert text == expected, "serial extraction differs from legacy"
+
+            app.config["PDF_PARALLEL_WORKERS"] = args.workers
+            app.config["PDF_PARALLEL_MIN_PAGES"] = 2
+            extract_text_from_pdf(path, 0, 0)  # warm up the process pool
+            parallel, text = timed(extract_text_from_pdf, path, 0, 0)
+            assert text == expected, "parallel extraction differs from legacy"
+
+            app.config["PDF_PARALLEL_WORKERS"] = 0
+            budgeted, _ = timed(extract_text_from_pdf, path, 50, 200_000)
+
+            size_kb = os.path.getsize(path) / 1024
+            print(f"{page_count:4d} pages ({size_kb:7.1f} KB)")
+            print(f"    legacy +=          {legacy * 1000:9.1f} ms")
+            print(f"    streaming          {serial * 1000:9.1f} ms")
+            print(f"    parallel x{args.workers:<2d}       {parallel * 1000:9.1f} ms")
+            print(f"    budget 50p/200k    {budgeted * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""Parity and speed check for SkillMatcher against the per-term regex loop.
+
+Usage: python benchmarks/bench_skill_matcher.py [--docs 200] [--repeat 5]
+"""
+
+import argparse
+import re
+import time
+
+from resume_corpus import make_corpus
+
+from app import SKILL_MATCHER, SKILL_VOCABULARY, format_skill_name
+
+
+def legacy_match(text_lower):
+    """The original implementation: one re.search per vocabulary term"""
+    extracted = {}
+    for category, terms in SKILL_VOCABULARY.items():
+        extracted[category] = [
+            format_skill_name(category, term)
+            for term in terms
+            if re.search(r"\b" + re.escape(term) + r"\b", text_lower)
+        ]
+    return extracted
+
+
+def best_of(func, corpus, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in corpus:
+            func(text)
+        timings.append(time.perf_counter() - start)
+    return min(timings) / len(corpus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--docs", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    corpus = [text.lower() for text in make_corpus(args.docs)]
+    mismatches = [
+        index
+        for index, text in enumerate(corpus)
+        if SKILL_MATCHER.match(text) != legacy_match(text)
+    ]
+    if mismatches:
+        raise SystemExit(f"Parity check failed for documents {mismatches[:10]}")
+
+    avg_size = sum(len(text) for text in corpus) / len(corpus)
+    legacy = best_of(legacy_match, corpus, args.repeat)
+    matcher = best_of(SKILL_MATCHER.match, corpus, args.repeat)
+    print(f"documents: {len(corpus)} (avg {avg_size / 1024:.1f} KB), parity OK")
+    print(f"per-term re.search: {legacy * 1000:8.3f} ms/doc")
+    print(f"SkillMatcher:       {matcher * 1000:8.3f} ms/doc")
+    print(f"speedup:            {legacy / matcher:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""Latency of /api/search/skills queries against a large skill index.
+
+Seeds a throwaway database with ``--resumes`` synthetic postings (skills drawn
+with a skewed distribution from the real vocabulary, so common skills have
+hundreds of thousands of postings) and times AND, OR and mixed queries for the
+first page and a deep page.
+
+Usage: python benchmarks/bench_skill_search.py [--resumes 1000000] [--skills 15]
+"""
+
+import argparse
+import atexit
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="skilllens-bench-")
+atexit.register(shutil.rmtree, WORKDIR, ignore_errors=True)
+os.environ["DATABASE_PATH"] = os.path.join(WORKDIR, "app.db")
+os.environ["UPLOAD_FOLDER"] = os.path.join(WORKDIR, "uploads")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["REEXTRACT_ON_STARTUP"] = "0"
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+import app as skilllens  # noqa: E402
+from migrations import migrate  # noqa: E402
+
+QUERIES = [
+    (["python"], []),
+    (["python", "sql"], []),
+    (["python", "sql", "tableau"], []),
+    (["react", "kubernetes", "leadership"], []),
+    ([], ["tableau", "power bi"]),
+    ([], ["python", "java", "go", "rust"]),
+    (["python"], ["aws", "azure", "gcp"]),
+]
+
+
+def seed(conn, resumes, skills_per_resume, rng):
+    vocabulary = sorted(
+        {term for terms in skilllens.SKILL_VOCABULARY.values() for term in terms}
+    )
+    # Make the usual suspects common and the long tail rare
+    for term in ("sql", "python", "tableau", "react", "leadership"):
+        vocabulary.remove(term)
+        vocabulary.insert(0, term)
+    weights = [1 / (rank + 1) ** 0.8 for rank in range(len(vocabulary))]
+
+    conn.execute("PRAGMA journal_mode=OFF")
+    conn.execute("PRAGMA synchronous=OFF")
+    postings = set()
+    for resume_id in range(1, resumes + 1):
+        for term in rng.choices(vocabulary, weights, k=skills_per_resume):
+            postings.add((term, resume_id))
+    conn.executemany(
+        "INSERT INTO skill_index (skill, resume_id) VALUES (?, ?)", sorted(postings)
+    )
+    conn.execute(
+        "INSERT INTO skill_counts SELECT skill, COUNT(*) FROM skill_index GROUP BY skill"
+    )
+    conn.commit()
+    return len(postings)
+
+
+def timed(query, repeat=5):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = query()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=1_000_000)
+    parser.add_argument("--skills", type=int, default=15)
+    parser.add_argument("--limit", type=int, default=20)
+    args = parser.parse_args()
+
+    conn = sqlite3.connect(os.path.join(WORKDIR, "bench.db"))
+    migrate(conn)
+    start = time.perf_counter()
+    count = seed(conn, args.resumes, args.skills, random.Random(42))
+    print(f"seeded {count} postings in {time.perf_counter() - start:.1f}s\n")
+
+    print(f"{'query':50s} {'page 1':>10s} {'page 50':>10s} {'hits':>6s}")
+    for all_skills, any_skills in QUERIES:
+        first, ids = timed(
+            lambda: skilllens.search_resume_ids(
+                conn, all_skills, any_skills, args.limit
+            )
+        )
+        # Deep page: jump the cursor as if 49 pages had been read
+        cursor = ids[-1] - 49 * (ids[0] - ids[-1]) if ids else None
+        deep, _ = timed(
+            lambda: skilllens.search_resume_ids(
+                conn, all_skills, any_skills, args.limit, before=cursor
+            )
+        )
+        label = " AND ".join(all_skills)
+        if any_skills:
+            label += (" AND " if label else "") + f"({' OR '.join(any_skills)})"
+        print(f"{label:50s} {first * 1000:7.2f} ms {deep * 1000:7.2f} ms {len(ids):6d}")
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Database size and /api/analyze read latency before/after compressed storage.
+
+Seeds a throwaway database at schema version 4 (plain TEXT resume text and
+JSON columns), upgrades it to the current schema and backfills the full-text
+index as ``rebuild_search.py`` does, then measures its size and the resume read
+done by /api/analyze (``SELECT skills_json`` + ``json.loads``). It then
+compresses the rows as ``compact_storage.py`` does, vacuums and measures again.
+Both sides carry the same search index, whose size is reported separately.
+
+Usage: python benchmarks/bench_storage.py [--resumes 5000] [--analyses 4]
+"""
+
+import argparse
+import atexit
+import json
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+
+WORKDIR = tempfile.mkdtemp(prefix="skilllens-bench-")
+atexit.register(shutil.rmtree, WORKDIR, ignore_errors=True)
+os.environ["DATABASE_PATH"] = os.path.join(WORKDIR, "app.db")
+os.environ["UPLOAD_FOLDER"] = os.path.join(WORKDIR, "uploads")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["REEXTRACT_ON_STARTUP"] = "0"
+
+from resume_corpus import make_corpus  # noqa: E402
+
+import app as skilllens  # noqa: E402
+from compact_storage import COMPRESSED_COLUMNS, compact_range  # noqa: E402
+from migrations import migrate  # noqa: E402
+from rebuild_search import index_missing  # noqa: E402
+
+ROLES = list(skilllens.ROLE_REQUIREMENTS)
+
+
+def seed(conn, resumes, analyses, rng):
+    corpus = make_corpus(200)
+    skills = [skilllens.extract_skills_from_resume(text) for text in corpus]
+    conn.execute(
+        "INSERT INTO users (id, email, password, full_name) VALUES (1, 'bench@example.com', 'x', 'Bench')"
+    )
+    conn.executemany(
+        "INSERT INTO resumes (id, user_id, filename, extracted_text, skills_json) VALUES (?, 1, ?, ?, ?)",
+        (
+            (i, f"resume{i}.pdf", corpus[i % 200], json.dumps(skills[i % 200]))
+            for i in range(1, resumes + 1)
+        ),
+    )
+    rows = []
+    for i in range(1, resumes + 1):
+        for _ in range(analyses):
+            role = rng.choice(ROLES)
+            gap, roadmap, _ = skilllens.run_role_analysis(skills[i % 200], role)
+            rows.append((i, role, json.dumps(gap), json.dumps(roadmap), gap["score"]))
+    conn.executemany(
+        "INSERT INTO analysis (user_id, resume_id, target_role, skill_gap_json, roadmap_json, score) VALUES (1, ?, ?, ?, ?, ?)",
+        rows,
+    )
+    conn.commit()
+
+
+def database_size(conn, path):
+    conn.execute("VACUUM")
+    return os.path.getsize(path)
+
+
+def search_index_size(conn):
+    (size,) = conn.execute(
+        "SELECT COALESCE(SUM(pgsize), 0) FROM dbstat WHERE name LIKE 'resumes_fts%'"
+    ).fetchone()
+    return size
+
+
+def table_sizes(conn):
+    return dict(
+        conn.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat GROUP BY name ORDER BY 2 DESC LIMIT 6"
+        )
+    )
+
+
+def time_reads(read, resume_ids):
+    start = time.perf_counter()
+    for resume_id in resume_ids:
+        read(resume_id)
+    return (time.perf_counter() - start) / len(resume_ids)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--resumes", type=int, default=5000)
+    parser.add_argument("--analyses", type=int, default=4)
+    parser.add_argument("--samples", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    path = os.path.join(WORKDIR, "bench.db")
+    conn = sqlite3.connect(path)
+    migrate(conn, target=4)
+    seed(conn, args.resumes, args.analyses, rng)
+    resume_ids = [rng.randint(1, args.resumes) for _ in range(args.samples)]
+
+    def read_json(resume_id):
+        row = conn.execute(
+            "SELECT skills_json FROM resumes WHERE id = ? AND user_id = 1",
+            (resume_id,),
+        ).fetchone()
+        return json.loads(row[0])
+
+    def last_key(table, key):
+        (last,) = conn.execute(
+            f"SELECT COALESCE(MAX({key}), 0) FROM {table}"
+        ).fetchone()
+        return last
+
+    # An upgraded database before compact_storage.py: current schema, plain
+    # rows, search index backfilled
+    migrate(conn)
+    index_missing(conn.cursor(), 0, last_key("resumes", "id"))
+    conn.commit()
+
+    size_before = database_size(conn, path)
+    index_before = search_index_size(conn)
+    tables_before = table_sizes(conn)
+    read_before = time_reads(read_json, resume_ids)
+
+    start = time.perf_counter()
+    # Re-encoding leaves the text unchanged, so the index is not rewritten
+    for table, (key, columns) in COMPRESSED_COLUMNS.items():
+        compact_range(table, key, columns)(conn.cursor(), 0, last_key(table, key))
+    conn.commit()
+    print(f"compressed {args.resumes} resumes in {time.perf_counter() - start:.1f}s")
+
+    size_after = database_size(conn, path)
+    index_after = search_index_size(conn)
+    tables_after = table_sizes(conn)
+    read_after = time_reads(
+        lambda resume_id: skilllens.get_resume_skills(conn, 1, resume_id), resume_ids
+    )
+    conn.close()
+
+    print(f"\n{'':22s} {'before':>12s} {'after':>12s}")
+    print(
+        f"{'database size':22s} {size_before / 2**20:9.1f} MB {size_after / 2**20:9.1f} MB"
+        f"  ({size_after / size_before:.0%})"
+    )
+    print(
+        f"{'  of which search index':22s} {index_before / 2**20:9.1f} MB {index_after / 2**20:9.1f} MB"
+    )
+    rest_before, rest_after = size_before - index_before, size_after - index_after
+    print(
+        f"{'  everything else':22s} {rest_before / 2**20:9.1f} MB {rest_after / 2**20:9.1f} MB"
+        f"  ({rest_after / rest_before:.0%})"
+    )
+    print(
+        f"{'analyze resume read':22s} {read_before * 1e6:9.1f} us {read_after * 1e6:9.1f} us"
+    )
+    print()
+    for name in sorted(set(tables_before) | set(tables_after)):
+        print(
+            f"  {name:28s} {tables_before.get(name, 0) / 2**20:9.1f} MB"
+            f" {tables_after.get(name, 0) / 2**20:9.1f} MB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Synthetic resume corpus used by the benchmarks.
+
+Resumes are built from the real skill vocabulary plus filler prose so that
+their size and skill density look like the uploads we see in production
+(roughly 3-8 KB of extracted text, 20-60 skill mentions).
+"""
+
+import atexit
+import os
+import random
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(__file__)), "backend"))
+
+# Importing app opens its database and upload store; unless the benchmark
+# already pointed them somewhere, use a throwaway directory
+if "DATABASE_PATH" not in os.environ:
+    WORKDIR = tempfile.mkdtemp(prefix="skilllens-bench-")
+    atexit.register(shutil.rmtree, WORKDIR, ignore_errors=True)
+    os.environ["DATABASE_PATH"] = os.path.join(WORKDIR, "bench.db")
+    os.environ.setdefault("UPLOAD_FOLDER", os.path.join(WORKDIR, "uploads"))
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("REEXTRACT_ON_STARTUP", "0")
+
+from app import SKILL_VOCABULARY  # noqa: E402
+
+FILLER = (
+    "developed designed implemented maintained improved the a an of and with "
+    "for using across team members customers internal reporting pipeline "
+    "service platform feature release quality performance tested deployed "
+    "collaborated led mentored delivered reduced increased by percent"
+).split()
+
+# Spellings that stress the word-boundary rules (c vs c++, git vs github, ...)
+TRICKY = ["c++11", "c#.", "(c)", "c++ ", "github/gitlab", "node.js,", "ci/cd:", "r&d"]
+
+SECTIONS = [
+    "summary",
+    "skills",
+    "projects",
+    "experience",
+    "education",
+    "certifications",
+]
+
+
+def make_resume(rng, paragraphs=12):
+    terms = [term for group in SKILL_VOCABULARY.values() for term in group]
+    lines = [
+        f"candidate {rng.randint(1, 10_000)}",
+        f"{rng.randint(0, 8)} years of experience",
+    ]
+    for index in range(paragraphs):
+        lines.append(SECTIONS[index % len(SECTIONS)] + ":")
+        for _ in range(rng.randint(3, 6)):
+            words = []
+            for _ in range(rng.randint(10, 18)):
+                roll = rng.random()
+                if roll < 0.08:
+                    words.append(rng.choice(terms))
+                elif roll < 0.09:
+                    words.append(rng.choice(TRICKY))
+                else:
+                    words.append(rng.choice(FILLER))
+            lines.append("- " + " ".join(words).capitalize())
+    return "\n".join(lines)
+
+
+def make_corpus(count=200, seed=1234):
+    rng = random.Random(seed)
+    return [make_resume(rng) for _ in range(count)]
+
+
+def _pdf_escape(line):
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def make_pdf(pages):
+    """Build a minimal text PDF (Helvetica, one content stream per page)"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, None]
+    objects[2] = "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    page_ids = []
+    for text in pages:
+        lines = text.splitlines()[:60]
+        stream = "BT /F1 9 Tf 11 TL 40 800 Td " + " ".join(
+            f"({_pdf_escape(line[:110])}) '" for line in lines
+        )
+        stream += " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>"
+        )
+        page_ids.append(len(objects))
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>"
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1", "replace")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return bytes(out)
+
+
+def make_resume_pdf(page_count, seed=1234):
+    rng = random.Random(seed)
+    return make_pdf([make_resume(rng, paragraphs=6) for _ in range(page_count)])
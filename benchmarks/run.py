@@ -0,0 +1,300 @@
+"""Reproducible benchmark suite for the resume pipeline and the API.
+
+Runs micro-benchmarks of the pipeline functions over synthetic resume PDFs of
+several sizes, then load-tests the main endpoints through the Flask test
+client against a freshly seeded SQLite database in a temp directory. Results
+are written as JSON; ``--compare`` checks them against a saved baseline and
+exits non-zero when a benchmark's p50 got slower than the allowed threshold
+and also slower than the baseline's p90, so run-to-run noise within the
+baseline's own spread is not reported as a regression. Benchmarks are
+timed in ``--rounds`` interleaved rounds and each keeps its fastest, since
+background load on a shared machine only ever adds time.
+
+Usage:
+    python benchmarks/run.py --output results.json
+    python benchmarks/run.py --compare baseline.json [--threshold 0.2]
+"""
+
+import argparse
+import atexit
+import io
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+WORKDIR = tempfile.mkdtemp(prefix="skilllens-bench-")
+atexit.register(shutil.rmtree, WORKDIR, ignore_errors=True)
+# Point the app at a throwaway database and upload store before it is imported
+os.environ["DATABASE_PATH"] = os.path.join(WORKDIR, "bench.db")
+os.environ["UPLOAD_FOLDER"] = os.path.join(WORKDIR, "uploads")
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ["REEXTRACT_ON_STARTUP"] = "0"
+
+# Timing rounds per benchmark (--rounds); the fastest round is kept
+ROUNDS = 3
+
+from resume_corpus import make_corpus, make_resume_pdf  # noqa: E402
+
+import app as skilllens  # noqa: E402
+from db import db_connection  # noqa: E402
+
+PDF_SIZES = (1, 5, 20)
+ROLES = list(skilllens.ROLE_REQUIREMENTS)
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p90_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+    }
+
+
+def sample(func, iterations, inner=1):
+    """Time ``iterations`` samples of ``inner`` calls; returns seconds per call"""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        for _ in range(inner):
+            func()
+        samples.append((time.perf_counter() - start) / inner)
+    return samples
+
+
+def measure(benchmarks, warmup=3):
+    """Summarize each of ``benchmarks``, a dict name -> (func, iterations, inner)
+
+    The first ``warmup`` calls (cold caches, lazy imports, pools) are not timed.
+    Benchmarks are timed ``ROUNDS`` times, taking turns so that a slow spell on
+    the machine is spread over all of them, and each keeps its round with the
+    lowest p50.
+    """
+    for func, _, _ in benchmarks.values():
+        for _ in range(warmup):
+            func()
+    results = {}
+    for _ in range(ROUNDS):
+        for name, (func, iterations, inner) in benchmarks.items():
+            summary = summarize(sample(func, iterations, inner))
+            if name not in results or summary["p50_ms"] < results[name]["p50_ms"]:
+                results[name] = summary
+    return results
+
+
+def micro_benchmarks(scale):
+    benchmarks = {}
+
+    for pages in PDF_SIZES:
+        path = os.path.join(WORKDIR, f"resume_{pages}p.pdf")
+        with open(path, "wb") as file:
+            file.write(make_resume_pdf(pages))
+        benchmarks[f"extract_text_from_pdf[{pages}p]"] = (
+            lambda path=path: skilllens.extract_text_from_pdf(path),
+            40 * scale,
+            1,
+        )
+
+    corpus = make_corpus(50)
+    texts = iter(corpus * 1000)
+    benchmarks["extract_skills_from_resume"] = (
+        lambda: skilllens.extract_skills_from_resume(next(texts)),
+        20 * scale,
+        5,
+    )
+
+    skills = [skilllens.extract_skills_from_resume(text) for text in corpus]
+    pairs = [(s, role) for s in skills for role in ROLES]
+    rng = random.Random(7)
+    benchmarks["analyze_skill_gap"] = (
+        lambda: skilllens.analyze_skill_gap(*rng.choice(pairs)),
+        20 * scale,
+        50,
+    )
+
+    gaps = [(skilllens.analyze_skill_gap(s, role), role) for s, role in pairs]
+    benchmarks["generate_roadmap"] = (
+        lambda: skilllens.generate_roadmap(*rng.choice(gaps), "Intermediate"),
+        20 * scale,
+        50,
+    )
+    missing = [gap["critical_missing"] + gap["important_missing"] for gap, _ in gaps]
+    benchmarks["recommend_courses"] = (
+        lambda: skilllens.recommend_courses(rng.choice(missing)[:10]),
+        20 * scale,
+        50,
+    )
+    return measure(benchmarks)
+
+
+def seed_database(users, resumes_per_user, analyses_per_resume):
+    """Bulk-insert background users so queries run against realistic tables"""
+    rng = random.Random(11)
+    corpus = make_corpus(20)
+    skills_json = [json.dumps(skilllens.extract_skills_from_resume(t)) for t in corpus]
+    with db_connection() as conn:
+        c = conn.cursor()
+        c.executemany(
+            "INSERT INTO users (email, password, full_name) VALUES (?, 'x', 'Seed')",
+            [(f"seed{i}@example.com",) for i in range(users)],
+        )
+        user_ids = [row[0] for row in c.execute("SELECT id FROM users")]
+        c.executemany(
+            "INSERT INTO resumes (user_id, filename, extracted_text, skills_json) VALUES (?, ?, ?, ?)",
+            [
+                (user_id, f"{user_id}_{n}.pdf", corpus[n % 20], skills_json[n % 20])
+                for user_id in user_ids
+                for n in range(resumes_per_user)
+            ],
+        )
+        resumes = c.execute("SELECT id, user_id FROM resumes").fetchall()
+        c.executemany(
+            "INSERT INTO analysis (user_id, resume_id, target_role, skill_gap_json, roadmap_json, score) VALUES (?, ?, ?, '{}', '{}', ?)",
+            [
+                (user_id, resume_id, rng.choice(ROLES), rng.randint(0, 100))
+                for resume_id, user_id in resumes
+                for _ in range(analyses_per_resume)
+            ],
+        )
+        conn.commit()
+
+
+def endpoint_benchmarks(scale):
+    seed_database(users=200 * scale, resumes_per_user=3, analyses_per_resume=5)
+
+    client = skilllens.app.test_client()
+    client.post(
+        "/api/register",
+        json={
+            "email": "bench@example.com",
+            "password": "benchmark",
+            "full_name": "Bench",
+        },
+    )
+    pdfs = [make_resume_pdf(2, seed=seed) for seed in range(5)]
+
+    def upload():
+        response = client.post(
+            "/api/upload-resume",
+            data={"resume": (io.BytesIO(random.choice(pdfs)), "resume.pdf")},
+            content_type="multipart/form-data",
+        )
+        assert response.status_code == 200, response.data
+        return response.json["resume_id"]
+
+    def fingerprinted_asset():
+        response = client.get("/" + asset_path)
+        # Shared caches keep these for a year: no user's session may ride along
+        assert response.status_code == 200, response.status
+        assert "Set-Cookie" not in response.headers, response.headers
+        assert "Cookie" not in response.vary, response.headers
+
+    asset_path = next(iter(skilllens.ASSETS.fingerprinted))
+    resume_id = upload()
+    requests = {
+        "POST /api/upload-resume": upload,
+        "POST /api/analyze": lambda: client.post(
+            "/api/analyze",
+            json={"resume_id": resume_id, "target_role": random.choice(ROLES)},
+        ),
+        "POST /api/analyze/rank": lambda: client.post(
+            "/api/analyze/rank", json={"resume_id": resume_id}
+        ),
+        "GET /api/check-auth": lambda: client.get("/api/check-auth"),
+        "GET /api/dashboard": lambda: client.get("/api/dashboard"),
+        "GET /api/profile": lambda: client.get("/api/profile"),
+        "GET /static (fingerprinted)": fingerprinted_asset,
+    }
+    return measure({name: (func, 30 * scale, 1) for name, func in requests.items()})
+
+
+def compare(results, baseline, threshold):
+    """Return [(name, baseline_p50, current_p50, change)] that regressed
+
+    A benchmark regressed when its p50 is more than ``threshold`` above the
+    baseline p50 and also above the baseline p90 (p95 for older baselines).
+    """
+    regressions = []
+    for name, current in results["results"].items():
+        previous = baseline["results"].get(name)
+        if not previous or not previous["p50_ms"]:
+            continue
+        p50 = current["p50_ms"]
+        change = p50 / previous["p50_ms"] - 1
+        spread = previous.get("p90_ms", previous["p95_ms"])
+        regressed = change > threshold and p50 > spread
+        marker = "REGRESSION" if regressed else ""
+        print(
+            f"  {name:40s} {previous['p50_ms']:10.3f} -> {p50:10.3f} ms"
+            f" {change:+7.1%} {marker}"
+        )
+        if regressed:
+            regressions.append((name, previous["p50_ms"], p50, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", help="write results JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="allowed p50 slowdown (0.2 = 20%%)"
+    )
+    parser.add_argument("--scale", type=int, default=1, help="multiply iterations")
+    parser.add_argument("--only", choices=["micro", "endpoints"])
+    parser.add_argument(
+        "--rounds", type=int, default=3, help="keep each benchmark's fastest round"
+    )
+    args = parser.parse_args()
+
+    random.seed(3)
+    global ROUNDS
+    ROUNDS = args.rounds
+    results = {}
+    if args.only in (None, "micro"):
+        results.update(micro_benchmarks(args.scale))
+    if args.only in (None, "endpoints"):
+        results.update(endpoint_benchmarks(args.scale))
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "scale": args.scale,
+            "rounds": args.rounds,
+        },
+        "results": results,
+    }
+
+    for name, stats in results.items():
+        print(
+            f"{name:40s} p50 {stats['p50_ms']:10.3f} ms  p95 {stats['p95_ms']:10.3f} ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        print(f"\ncompared with {args.compare} (threshold {args.threshold:.0%}):")
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) regressed")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()